@@ -122,3 +122,25 @@ INNER JOIN "Order" o ON u.UserID = o.UserID
 GROUP BY u.UserID, u.FullName
 ORDER BY "Total Spending" DESC
 LIMIT 1;
+
+SELECT 
+    oi.OrderID,
+    p.Title,
+    oi.UnitPrice AS "Sold Price",
+    eff.Price AS "Effective List Price"
+FROM OrderItem oi
+INNER JOIN "Order" o ON oi.OrderID = o.OrderID
+INNER JOIN Product p ON oi.ProductID = p.ProductID
+CROSS JOIN LATERAL (
+    SELECT COALESCE(
+        (SELECT ph.NewPrice FROM PriceHistory ph
+         WHERE ph.ProductID = oi.ProductID AND ph.ChangeDate <= o.OrderDate
+         ORDER BY ph.ChangeDate DESC, ph.HistoryID DESC LIMIT 1),
+        (SELECT ph.OldPrice FROM PriceHistory ph
+         WHERE ph.ProductID = oi.ProductID AND ph.ChangeDate > o.OrderDate
+         ORDER BY ph.ChangeDate ASC, ph.HistoryID ASC LIMIT 1),
+        p.CurrentPrice
+    ) AS Price
+) eff
+ORDER BY o.OrderDate DESC
+LIMIT 20;
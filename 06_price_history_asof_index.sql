@@ -0,0 +1,6 @@
+-- As-of price lookups ("what was the price of product X at time T") read the
+-- latest PriceHistory row per product at or before T. This index serves both
+-- the backward and forward probe as a single index range scan.
+-- CONCURRENTLY: migrate.py runs this file in autocommit mode.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricehistory_product_date
+ON PriceHistory(ProductID, ChangeDate DESC, HistoryID DESC);
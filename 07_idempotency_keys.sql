@@ -0,0 +1,19 @@
+-- Stored responses for requests sent with an Idempotency-Key header.
+-- A retry with the same key replays the stored response instead of
+-- creating another order / applying another campaign. The row is inserted
+-- and completed in one transaction, so a concurrent duplicate blocks on the
+-- primary key until the first attempt finishes.
+CREATE TABLE IF NOT EXISTS IdempotencyKey (
+    Endpoint VARCHAR(100) NOT NULL,
+    Key VARCHAR(255) NOT NULL,
+    RequestHash CHAR(64) NOT NULL,
+    StatusCode INTEGER,
+    ResponseBody TEXT,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (Endpoint, Key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotencykey_created ON IdempotencyKey(CreatedAt);
+
+-- Keys only need to outlive client retries; purge old ones periodically:
+-- DELETE FROM IdempotencyKey WHERE CreatedAt < NOW() - INTERVAL '1 day';
@@ -0,0 +1,29 @@
+-- Archiving (soft delete): archived rows keep their history and order
+-- references but are hidden from the catalog, dashboards and logins.
+ALTER TABLE Product ADD COLUMN IF NOT EXISTS DeletedAt TIMESTAMP;
+ALTER TABLE "User" ADD COLUMN IF NOT EXISTS DeletedAt TIMESTAMP;
+
+-- Deleting a product or user cascades through the foreign keys, so a hard
+-- delete is a single statement. The partial indexes for live rows and the
+-- OrderItem(ProductID) index the cascade needs are built concurrently in
+-- 17_archiving_indexes.sql. The constraints are swapped as NOT VALID (no scan
+-- under the ACCESS EXCLUSIVE lock) and validated in 18_validate_cascades.sql.
+ALTER TABLE Inventory DROP CONSTRAINT IF EXISTS inventory_productid_fkey,
+    ADD CONSTRAINT inventory_productid_fkey FOREIGN KEY (ProductID)
+    REFERENCES Product(ProductID) ON DELETE CASCADE NOT VALID;
+
+ALTER TABLE PriceHistory DROP CONSTRAINT IF EXISTS pricehistory_productid_fkey,
+    ADD CONSTRAINT pricehistory_productid_fkey FOREIGN KEY (ProductID)
+    REFERENCES Product(ProductID) ON DELETE CASCADE NOT VALID;
+
+ALTER TABLE OrderItem DROP CONSTRAINT IF EXISTS orderitem_productid_fkey,
+    ADD CONSTRAINT orderitem_productid_fkey FOREIGN KEY (ProductID)
+    REFERENCES Product(ProductID) ON DELETE CASCADE NOT VALID;
+
+ALTER TABLE OrderItem DROP CONSTRAINT IF EXISTS orderitem_orderid_fkey,
+    ADD CONSTRAINT orderitem_orderid_fkey FOREIGN KEY (OrderID)
+    REFERENCES "Order"(OrderID) ON DELETE CASCADE NOT VALID;
+
+ALTER TABLE "Order" DROP CONSTRAINT IF EXISTS "Order_userid_fkey",
+    ADD CONSTRAINT "Order_userid_fkey" FOREIGN KEY (UserID)
+    REFERENCES "User"(UserID) ON DELETE CASCADE NOT VALID;
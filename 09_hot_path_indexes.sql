@@ -0,0 +1,23 @@
+-- Indexes for the hot query paths, built without blocking writes.
+-- CONCURRENTLY cannot run inside a transaction; migrate.py detects it and
+-- runs this file statement by statement in autocommit mode.
+
+-- Order list / monthly revenue: newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_date
+ON "Order"(OrderDate DESC, OrderID DESC);
+
+-- Revenue dashboards filter on status before aggregating by date
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_status_date
+ON "Order"(Status, OrderDate);
+
+-- Pricing trigger cooldown check: last change per product and reason
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricehistory_product_reason_date
+ON PriceHistory(ProductID, Reason, ChangeDate DESC);
+
+-- Price trend dashboard groups by change date
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pricehistory_date
+ON PriceHistory(ChangeDate);
+
+-- Low-stock list and count only touch the (few) rows under the threshold
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_low_stock
+ON Inventory(StockQuantity) WHERE StockQuantity < LowStockThreshold;
@@ -0,0 +1,61 @@
+-- Stock threshold events: one row (and one NOTIFY on channel 'stock_events')
+-- each time a product crosses into or out of low stock / overstock.
+-- Consumers read them with GET /api/inventory/events?since=<event_id>
+-- instead of scanning the whole Inventory table.
+CREATE TABLE IF NOT EXISTS StockEvent (
+    EventID BIGSERIAL PRIMARY KEY,
+    ProductID INTEGER NOT NULL REFERENCES Product(ProductID) ON DELETE CASCADE,
+    EventType VARCHAR(20) NOT NULL CHECK (EventType IN ('low_stock', 'overstock', 'normal')),
+    StockQuantity INTEGER NOT NULL,
+    LowStockThreshold INTEGER,
+    HighStockThreshold INTEGER,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_stockevent_product ON StockEvent(ProductID);
+
+CREATE OR REPLACE FUNCTION stock_status(quantity INTEGER, low INTEGER, high INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT CASE
+        WHEN quantity < low THEN 'low_stock'
+        WHEN quantity > high THEN 'overstock'
+        ELSE 'normal'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION emit_stock_event()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_status VARCHAR(20) := 'normal';
+    new_status VARCHAR(20);
+    event_id BIGINT;
+BEGIN
+    new_status := stock_status(NEW.StockQuantity, NEW.LowStockThreshold, NEW.HighStockThreshold);
+    IF TG_OP = 'UPDATE' THEN
+        old_status := stock_status(OLD.StockQuantity, OLD.LowStockThreshold, OLD.HighStockThreshold);
+    END IF;
+
+    IF new_status <> old_status THEN
+        INSERT INTO StockEvent (ProductID, EventType, StockQuantity, LowStockThreshold, HighStockThreshold)
+        VALUES (NEW.ProductID, new_status, NEW.StockQuantity, NEW.LowStockThreshold, NEW.HighStockThreshold)
+        RETURNING EventID INTO event_id;
+
+        PERFORM pg_notify('stock_events', json_build_object(
+            'event_id', event_id,
+            'product_id', NEW.ProductID,
+            'event_type', new_status,
+            'stock_quantity', NEW.StockQuantity
+        )::text);
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stock_events ON Inventory;
+
+CREATE TRIGGER trg_stock_events
+AFTER INSERT OR UPDATE OF StockQuantity, LowStockThreshold, HighStockThreshold
+ON Inventory
+FOR EACH ROW
+EXECUTE FUNCTION emit_stock_event();
@@ -0,0 +1,4 @@
+-- Demand forecast results written back by forecast.py
+ALTER TABLE Inventory ADD COLUMN IF NOT EXISTS ForecastDailyDemand DECIMAL(12, 3);
+ALTER TABLE Inventory ADD COLUMN IF NOT EXISTS SuggestedRestockQty INTEGER;
+ALTER TABLE Inventory ADD COLUMN IF NOT EXISTS ForecastedAt TIMESTAMP;
@@ -0,0 +1,4 @@
+-- Access tokens issued before this time are rejected (logout, password or
+-- role change). API workers poll recent values into an in-memory cache, so
+-- token checks never query the database.
+ALTER TABLE "User" ADD COLUMN IF NOT EXISTS TokensValidAfter TIMESTAMP;
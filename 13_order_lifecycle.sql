@@ -0,0 +1,88 @@
+-- Order lifecycle: pending -> processing -> completed / cancelled
+-- (POST /api/orders/status) and a daily revenue aggregate kept current by
+-- statement-level triggers, so revenue dashboards don't re-scan "Order".
+ALTER TABLE "Order" ADD COLUMN IF NOT EXISTS StatusChangedAt TIMESTAMP;
+
+-- Revenue and order count of completed orders, by order date
+CREATE TABLE IF NOT EXISTS RevenueDaily (
+    Day DATE PRIMARY KEY,
+    Revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    Orders INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION apply_revenue_delta()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Transition tables only exist for the operations that have them;
+    -- rows are upserted in day order so concurrent batches lock alike
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM RevenueDaily;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO RevenueDaily (Day, Revenue, Orders)
+        SELECT OrderDate::date, SUM(TotalAmount), COUNT(*)
+        FROM new_rows WHERE Status = 'completed'
+        GROUP BY 1 ORDER BY 1
+        ON CONFLICT (Day) DO UPDATE
+        SET Revenue = RevenueDaily.Revenue + EXCLUDED.Revenue,
+            Orders = RevenueDaily.Orders + EXCLUDED.Orders;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO RevenueDaily (Day, Revenue, Orders)
+        SELECT OrderDate::date, -SUM(TotalAmount), -COUNT(*)
+        FROM old_rows WHERE Status = 'completed'
+        GROUP BY 1 ORDER BY 1
+        ON CONFLICT (Day) DO UPDATE
+        SET Revenue = RevenueDaily.Revenue + EXCLUDED.Revenue,
+            Orders = RevenueDaily.Orders + EXCLUDED.Orders;
+    ELSE
+        INSERT INTO RevenueDaily (Day, Revenue, Orders)
+        SELECT day, SUM(revenue), SUM(orders)
+        FROM (
+            SELECT OrderDate::date AS day, -TotalAmount AS revenue, -1 AS orders
+            FROM old_rows WHERE Status = 'completed'
+            UNION ALL
+            SELECT OrderDate::date, TotalAmount, 1
+            FROM new_rows WHERE Status = 'completed'
+        ) delta
+        GROUP BY day
+        HAVING SUM(orders) <> 0 OR SUM(revenue) <> 0
+        ORDER BY day
+        ON CONFLICT (Day) DO UPDATE
+        SET Revenue = RevenueDaily.Revenue + EXCLUDED.Revenue,
+            Orders = RevenueDaily.Orders + EXCLUDED.Orders;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_revenue_insert ON "Order";
+DROP TRIGGER IF EXISTS trg_revenue_update ON "Order";
+DROP TRIGGER IF EXISTS trg_revenue_delete ON "Order";
+DROP TRIGGER IF EXISTS trg_revenue_truncate ON "Order";
+
+CREATE TRIGGER trg_revenue_insert
+AFTER INSERT ON "Order"
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_revenue_delta();
+
+CREATE TRIGGER trg_revenue_update
+AFTER UPDATE ON "Order"
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_revenue_delta();
+
+CREATE TRIGGER trg_revenue_delete
+AFTER DELETE ON "Order"
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION apply_revenue_delta();
+
+-- generate_data.py truncates "Order" (also via TRUNCATE "User" CASCADE)
+CREATE TRIGGER trg_revenue_truncate
+AFTER TRUNCATE ON "Order"
+FOR EACH STATEMENT EXECUTE FUNCTION apply_revenue_delta();
+
+-- Backfill (the triggers above keep it current from here on)
+TRUNCATE RevenueDaily;
+INSERT INTO RevenueDaily (Day, Revenue, Orders)
+SELECT OrderDate::date, SUM(TotalAmount), COUNT(*)
+FROM "Order"
+WHERE Status = 'completed'
+GROUP BY 1;
@@ -0,0 +1,41 @@
+-- Per-table change counters for HTTP caching (http_cache.py). Statement-level
+-- triggers bump a table's version on every write, so catalog responses can be
+-- revalidated (ETag / 304) without re-running their queries.
+CREATE TABLE IF NOT EXISTS TableVersion (
+    TableName VARCHAR(63) PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0,
+    ChangedAt TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO TableVersion (TableName)
+VALUES ('category'), ('supplier'), ('product')
+ON CONFLICT (TableName) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE TableVersion
+    SET Version = Version + 1, ChangedAt = NOW()
+    WHERE TableName = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_version_category ON Category;
+DROP TRIGGER IF EXISTS trg_version_supplier ON Supplier;
+DROP TRIGGER IF EXISTS trg_version_product ON Product;
+
+CREATE TRIGGER trg_version_category
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Category
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+CREATE TRIGGER trg_version_supplier
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Supplier
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- Only changes that move products between categories/suppliers or in and
+-- out of the catalog: the price updates made during checkout (04_create_triggers.sql)
+-- must not all queue up behind the one 'product' row
+CREATE TRIGGER trg_version_product
+AFTER INSERT OR DELETE OR TRUNCATE OR UPDATE OF CategoryID, SupplierID, DeletedAt ON Product
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
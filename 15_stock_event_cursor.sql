@@ -0,0 +1,10 @@
+-- Commit-safe cursor for the stock event feed (GET /api/inventory/events).
+-- EventIDs are taken when an event is inserted, not when it commits, so a
+-- reader that got up to id N could skip id N-1 committed after it. Each event
+-- now records its transaction; the feed only returns events of transactions
+-- older than every transaction still running, in (TxID, EventID) order.
+ALTER TABLE StockEvent ADD COLUMN IF NOT EXISTS TxID xid8;
+ALTER TABLE StockEvent ALTER COLUMN TxID SET DEFAULT pg_current_xact_id();
+
+-- Existing events are all committed: they come first, in EventID order
+UPDATE StockEvent SET TxID = '1' WHERE TxID IS NULL;
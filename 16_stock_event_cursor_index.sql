@@ -0,0 +1,4 @@
+-- Feed reads walk StockEvent in cursor order (see 15_stock_event_cursor.sql).
+-- CONCURRENTLY: migrate.py runs this file in autocommit mode.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_stockevent_cursor
+ON StockEvent(TxID, EventID);
@@ -0,0 +1,16 @@
+-- Indexes for archiving and cascading deletes (08_deletes_and_archiving.sql),
+-- built without blocking writes. migrate.py runs this file in autocommit mode.
+
+-- Hot catalog queries only read live products
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_live
+ON Product(ProductID) WHERE DeletedAt IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_live_category
+ON Product(CategoryID) WHERE DeletedAt IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_live
+ON "User"(UserID) WHERE DeletedAt IS NULL;
+
+-- Without it, deleting a product scans all of OrderItem for the cascade
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orderitem_product
+ON OrderItem(ProductID);
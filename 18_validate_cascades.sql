@@ -0,0 +1,9 @@
+-- Check the existing rows against the ON DELETE CASCADE constraints added as
+-- NOT VALID in 08_deletes_and_archiving.sql. VALIDATE CONSTRAINT only takes a
+-- SHARE UPDATE EXCLUSIVE lock, so reads and writes continue meanwhile.
+-- Already-valid constraints are a no-op.
+ALTER TABLE Inventory VALIDATE CONSTRAINT inventory_productid_fkey;
+ALTER TABLE PriceHistory VALIDATE CONSTRAINT pricehistory_productid_fkey;
+ALTER TABLE OrderItem VALIDATE CONSTRAINT orderitem_productid_fkey;
+ALTER TABLE OrderItem VALIDATE CONSTRAINT orderitem_orderid_fkey;
+ALTER TABLE "Order" VALIDATE CONSTRAINT "Order_userid_fkey";
@@ -0,0 +1,4 @@
+-- Counterpart of idx_inventory_low_stock (09) for the overstock side.
+-- CONCURRENTLY: migrate.py runs this file in autocommit mode.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_overstock
+ON Inventory(StockQuantity) WHERE StockQuantity > HighStockThreshold;
@@ -0,0 +1,5 @@
+-- Revocation polling reads recently set TokensValidAfter values
+-- (12_user_token_revocation.sql). CONCURRENTLY: migrate.py runs this file in
+-- autocommit mode, so logins and signups are not blocked while it builds.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_tokens_valid_after
+ON "User"(TokensValidAfter) WHERE TokensValidAfter IS NOT NULL;
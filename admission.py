@@ -0,0 +1,216 @@
+"""
+Admission Control
+Keeps expensive admin/analytics requests from starving checkout:
+per-client token-bucket rate limits, per-class concurrency caps and a shared
+priority queue for database-bound work (checkout > storefront > admin).
+Limits apply per worker process.
+"""
+import re
+import time
+import heapq
+import asyncio
+import itertools
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from config import get_settings
+from auth import client_key
+
+
+class RequestClass:
+    def __init__(self, name: str, priority: int, concurrency: int = None,
+                 rate: float = None, burst: int = None, queue_timeout: float = 5.0):
+        self.name = name
+        self.priority = priority
+        self.gate = PriorityGate(concurrency) if concurrency else None
+        self.bucket = TokenBucket(rate, burst or int(rate)) if rate else None
+        self.queue_timeout = queue_timeout
+        self.admitted = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+
+    def metrics(self) -> dict:
+        return {
+            "class": self.name,
+            "priority": self.priority,
+            "in_flight": self.gate.in_flight if self.gate else None,
+            "queued": self.gate.queued if self.gate else None,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "timed_out": self.timed_out,
+        }
+
+
+class TokenBucket:
+    """Per-client token bucket: `rate` requests/second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+
+    def take(self, client: str) -> float:
+        """0 if a token was taken, otherwise seconds until one is available"""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > 10000:
+            self._prune(now)
+        return 0.0
+
+    def _prune(self, now: float):
+        full_after = self.burst / self.rate
+        self._buckets = {c: v for c, v in self._buckets.items() if now - v[1] < full_after}
+
+
+class PriorityGate:
+    """Counting semaphore whose waiters are woken lowest priority value first"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self._waiters = []
+        self._seq = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int, timeout: float) -> bool:
+        if self.in_flight < self.capacity and not self.queued:
+            self.in_flight += 1
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just before the timeout or a
+                # client disconnect; pass it on instead of leaking it
+                self.release()
+            else:
+                fut.cancel()
+                self._remove(fut)
+            if isinstance(e, asyncio.TimeoutError):
+                return False
+            raise
+
+    def _remove(self, fut):
+        self._waiters = [w for w in self._waiters if w[2] is not fut]
+        heapq.heapify(self._waiters)
+
+    def release(self):
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.in_flight -= 1
+
+
+CLASSES = {
+    "checkout": RequestClass("checkout", 0, queue_timeout=10.0),
+    "storefront": RequestClass("storefront", 1, concurrency=24, rate=20, burst=40, queue_timeout=2.0),
+    "default": RequestClass("default", 2, concurrency=16, rate=10, burst=20, queue_timeout=5.0),
+    "analytics": RequestClass("analytics", 3, concurrency=4, rate=1, burst=12, queue_timeout=1.0),
+}
+
+# (method, path pattern, class); patterns match from the start of the path,
+# `$` anchors one to the exact path. First match wins.
+ROUTES = [
+    ("POST", "/api/orders/status", "default"),
+    ("POST", "/api/orders/batch", "default"),
+    ("POST", "/api/orders", "checkout"),
+    ("POST", "/api/quotes", "checkout"),
+    ("GET", "/api/dashboard/", "analytics"),
+    ("GET", "/api/price-history", "analytics"),
+    ("GET", "/api/orders$", "analytics"),
+    ("GET", "/api/products", "storefront"),
+    ("POST", "/api/products/batch", "storefront"),
+    ("GET", "/api/categories", "storefront"),
+    ("POST", "/api/login", "storefront"),
+]
+ROUTES = [(method, re.compile(pattern), name) for method, pattern, name in ROUTES]
+
+# Not database-bound, never queued. The stock event long poll waits on the
+# worker's shared LISTEN connection for up to 30s and only queries when woken,
+# so holding a slot for it would starve everything else.
+EXEMPT_PREFIXES = ("/static/", "/docs", "/openapi.json", "/redoc", "/api/admission",
+                   "/api/inventory/events")
+
+_gate = None
+
+
+def get_gate() -> PriorityGate:
+    """Requests admitted to run at once, across all classes (roughly the DB
+    pool size); built from the settings on first use"""
+    global _gate
+    if _gate is None:
+        _gate = PriorityGate(get_settings().admission_max_in_flight)
+    return _gate
+
+
+def classify(request: Request):
+    path = request.url.path
+    if path in ("/", "/store") or path.startswith(EXEMPT_PREFIXES):
+        return None
+    for method, pattern, name in ROUTES:
+        if request.method == method and pattern.match(path):
+            # Unfiltered product listings cost as much as a report
+            if name == "storefront" and path == "/api/products" and not request.query_params:
+                return CLASSES["analytics"]
+            return CLASSES[name]
+    return CLASSES["default"]
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+    )
+
+
+async def admission_control(request: Request, call_next):
+    request_class = classify(request)
+    if request_class is None:
+        return await call_next(request)
+
+    if request_class.bucket is not None:
+        wait = request_class.bucket.take(client_key(request) or "-")
+        if wait:
+            request_class.rate_limited += 1
+            return _reject(429, "Too many requests", wait)
+
+    if request_class.gate is not None and not await request_class.gate.acquire(0, request_class.queue_timeout):
+        request_class.timed_out += 1
+        return _reject(503, "Server busy, please retry", 1)
+    gate = get_gate()
+    try:
+        if not await gate.acquire(request_class.priority, request_class.queue_timeout):
+            request_class.timed_out += 1
+            return _reject(503, "Server busy, please retry", 1)
+        try:
+            request_class.admitted += 1
+            return await call_next(request)
+        finally:
+            gate.release()
+    finally:
+        if request_class.gate is not None:
+            request_class.gate.release()
+
+
+def admission_metrics() -> dict:
+    gate = get_gate()
+    return {
+        "in_flight": gate.in_flight,
+        "queued": gate.queued,
+        "capacity": gate.capacity,
+        "classes": [c.metrics() for c in CLASSES.values()],
+    }
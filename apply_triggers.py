@@ -6,11 +6,9 @@ def apply_triggers():
         with open("04_create_triggers.sql", "r", encoding="utf-8") as f:
             sql_content = f.read()
             
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(sql_content)
-        conn.commit()
-        conn.close()
+        with get_db_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql_content)
+            conn.commit()
         print("[SUCCESS] Triggers successfully created!")
     except Exception as e:
         print(f"[ERROR] Error: {e}")
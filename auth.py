@@ -0,0 +1,149 @@
+"""
+Authentication
+Salted scrypt password hashing (run in the thread pool), signed access
+tokens verified without a database round trip, and role guards for routes.
+
+Revocations ("User".TokensValidAfter) are polled into an in-memory cache by
+a background task, so a request only pays for one HMAC check.
+"""
+import time
+import base64
+import asyncio
+import hashlib
+import secrets
+import hmac
+import functools
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from config import get_settings
+from signing import load_secret, sign, unsign
+from database import execute_query
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+
+# userid -> epoch seconds; tokens issued before it are rejected
+_revoked_after = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _secret() -> bytes:
+    return load_secret(get_settings().auth_secret, "AUTH_SECRET")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=64 * 1024 * 1024, dklen=32)
+
+
+def hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([
+        "scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode()
+    ])
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    if stored.startswith("scrypt$"):
+        _, n, r, p, salt, digest = stored.split("$")
+        candidate = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(candidate, base64.b64decode(digest))
+    # Unsalted SHA-256 hex from before scrypt; callers re-hash on success
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+
+
+def needs_rehash(stored: str) -> bool:
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+def issue_token(user: dict) -> tuple:
+    """(access_token, expires_at) for a "User" row"""
+    return sign(_secret(), {
+        "sub": user["userid"],
+        "role": user["role"],
+        "iat": round(time.time(), 3)
+    }, get_settings().auth_token_ttl_seconds, "access")
+
+
+def revoke_tokens(user_id: int):
+    """Invalidate every token issued to the user so far (all workers within
+    AUTH_REVOCATION_REFRESH_SECONDS, this one immediately)"""
+    execute_query('UPDATE "User" SET tokensvalidafter = NOW() WHERE userid = %s', (user_id,), fetch=False)
+    forget_tokens(user_id)
+
+
+def forget_tokens(user_id: int):
+    """Reject the user's current tokens in this worker, for callers that set
+    TokensValidAfter themselves"""
+    _revoked_after[user_id] = time.time()
+
+
+def _load_revocations():
+    rows = execute_query("""
+        SELECT userid, EXTRACT(EPOCH FROM tokensvalidafter::timestamptz) AS after
+        FROM "User"
+        WHERE tokensvalidafter > NOW() - %s * INTERVAL '1 second'
+    """, (get_settings().auth_token_ttl_seconds,))
+    return {row["userid"]: float(row["after"]) for row in rows}
+
+
+async def refresh_revocations_forever():
+    """Background task: keep the revocation cache in sync with the database"""
+    global _revoked_after
+    while True:
+        try:
+            loaded = await run_in_threadpool(_load_revocations)
+            # Keep revocations made here that the DB read may not have seen yet
+            for user_id, after in _revoked_after.items():
+                if after > loaded.get(user_id, 0):
+                    loaded[user_id] = after
+            _revoked_after = loaded
+        except Exception as e:
+            print(f"[WARN] Token revocation refresh failed: {e}")
+        await asyncio.sleep(get_settings().auth_revocation_refresh_seconds)
+
+
+def verify_token(token: str):
+    claims = unsign(_secret(), token, "access")
+    if claims is None:
+        return None
+    if claims.get("iat", 0) < _revoked_after.get(claims.get("sub"), 0):
+        return None
+    return claims
+
+
+def current_user(authorization: Optional[str] = Header(None)) -> dict:
+    """Claims of the bearer token ({"sub", "role", ...}); 401 without a valid one"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated",
+                            headers={"WWW-Authenticate": "Bearer"})
+    claims = verify_token(authorization[7:].strip())
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+def optional_user(authorization: Optional[str] = Header(None)):
+    """Claims of a valid bearer token, or None for anonymous requests"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    return verify_token(authorization[7:].strip())
+
+
+def client_key(request: Request) -> Optional[str]:
+    """Rate-limit and read-your-writes key: the verified token subject, else the connection IP"""
+    claims = optional_user(request.headers.get("authorization"))
+    if claims is not None:
+        return f"user:{claims['sub']}"
+    return request.client.host if request.client else None
+
+
+def require_role(*roles: str):
+    """Route dependency allowing only the given roles"""
+    def guard(claims: dict = Depends(current_user)) -> dict:
+        if claims["role"] not in roles:
+            raise HTTPException(status_code=403, detail="Not allowed")
+        return claims
+    return guard
@@ -0,0 +1,76 @@
+"""
+JSON SERIALIZATION MICRO-BENCHMARK
+----------------------------------
+Compares CPU time per 10k rows for the default FastAPI path
+(jsonable_encoder + JSONResponse) against FastJSONResponse, using rows
+shaped like the /api/products, /api/inventory and /api/orders results.
+No database needed:
+
+    python bench_json.py
+"""
+import json
+import time
+import random
+from decimal import Decimal
+from datetime import datetime, date, timedelta
+from psycopg2.extras import RealDictRow
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from responses import FastJSONResponse, orjson
+
+ROWS = 10_000
+REPEAT = 5
+
+
+def _row(fields: dict) -> RealDictRow:
+    row = RealDictRow()
+    row.update(fields)
+    return row
+
+
+def make_rows(n: int) -> dict:
+    now = datetime.now()
+    products = [_row({
+        "productid": i, "title": f"Pro Laptop {i:03d}", "description": "Lorem ipsum dolor sit amet.",
+        "baseprice": Decimal(f"{random.uniform(50, 20000):.2f}"),
+        "currentprice": Decimal(f"{random.uniform(50, 20000):.2f}"),
+        "isactive": True, "categoryid": i % 10, "supplierid": i % 7,
+        "category_name": "Electronics", "supplier_name": "Acme Ltd.", "stockquantity": i % 150,
+    }) for i in range(n)]
+    inventory = [_row({
+        "inventoryid": i, "productid": i, "stockquantity": i % 150, "lowstockthreshold": 10,
+        "highstockthreshold": 100, "lastrestockdate": date.today() - timedelta(days=i % 365),
+        "title": f"Pro Laptop {i:03d}", "currentprice": Decimal("1499.90"), "stock_status": "NORMAL",
+    }) for i in range(n)]
+    orders = [_row({
+        "orderid": i, "orderdate": now - timedelta(minutes=i), "status": "completed",
+        "totalamount": Decimal(f"{random.uniform(50, 5000):.2f}"), "shippingaddress": "Merkez Mah. 1. Sok. No:1, Ankara",
+        "customer_name": "Ayse Yilmaz", "order_items": "Pro Laptop 001 x2, Eco Bag 042 x1", "suppliers": "Acme Ltd.",
+    }) for i in range(n)]
+    return {"products": products, "inventory": inventory, "orders": orders}
+
+
+def default_path(rows):
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def fast_path(rows):
+    return FastJSONResponse(rows).body
+
+
+def cpu_ms(fn, rows) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.process_time()
+        fn(rows)
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    print(f"[INFO] Encoder: {'orjson' if orjson else 'json (stdlib)'}, {ROWS} rows, best of {REPEAT}")
+    for name, rows in make_rows(ROWS).items():
+        assert json.loads(default_path(rows)) == json.loads(fast_path(rows)), "output differs"
+        before = cpu_ms(default_path, rows)
+        after = cpu_ms(fast_path, rows)
+        print(f"  /api/{name:<10} before: {before:8.1f} ms   after: {after:7.1f} ms   ({before / after:5.1f}x)")
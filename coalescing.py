@@ -0,0 +1,96 @@
+"""
+Request Coalescing
+Single-flight for read endpoints: identical concurrent requests (same route
+and query parameters) share one handler run and its serialized response,
+and the response is reused for a short micro-cache window afterwards.
+"""
+import time
+import asyncio
+import functools
+from contextvars import ContextVar
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from responses import FastJSONResponse
+
+MAX_CACHE_ENTRIES = 1000
+
+_in_flight = {}
+_cache = {}
+
+# Extra cache-key part for the current request. http_cache puts the table
+# version stamp here so a body cached before a write is never reused after it.
+coalesce_scope = ContextVar("coalesce_scope", default=None)
+
+
+class CachedResponse:
+    __slots__ = ("status_code", "body", "media_type", "expires_at")
+
+    def __init__(self, result, ttl: float):
+        if not isinstance(result, Response):
+            result = FastJSONResponse(result)
+        self.status_code = result.status_code
+        self.body = result.body
+        self.media_type = result.media_type
+        self.expires_at = time.monotonic() + ttl
+
+    def response(self) -> Response:
+        return Response(content=self.body, status_code=self.status_code, media_type=self.media_type)
+
+
+def _store(key, entry: CachedResponse):
+    if len(_cache) >= MAX_CACHE_ENTRIES:
+        now = time.monotonic()
+        for stale in [k for k, v in _cache.items() if v.expires_at <= now]:
+            del _cache[stale]
+        if len(_cache) >= MAX_CACHE_ENTRIES:
+            _cache.clear()
+    _cache[key] = entry
+
+
+async def _load(key, func, args, kwargs, ttl: float) -> CachedResponse:
+    try:
+        if asyncio.iscoroutinefunction(func):
+            result = await func(*args, **kwargs)
+        else:
+            # Plain def handlers do blocking queries: keep them off the event loop
+            result = await run_in_threadpool(func, *args, **kwargs)
+        entry = CachedResponse(result, ttl)
+    finally:
+        _in_flight.pop(key, None)
+    if ttl > 0:
+        _store(key, entry)
+    return entry
+
+
+def _retrieve(task: asyncio.Task):
+    # Every waiter may have gone; don't log the error as never retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+def coalesce(ttl: float = 1.0):
+    """Opt a GET endpoint into single-flight + micro-caching for `ttl` seconds.
+
+    Responses are shared between clients, so only use it on routes whose
+    output doesn't depend on who is asking. Works on async and plain def
+    handlers (run in the threadpool, as FastAPI would). The handler runs in a task of its
+    own: a client that disconnects stops waiting without cancelling the run
+    the other requests are waiting for.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__name__, coalesce_scope.get(), tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+            cached = _cache.get(key)
+            if cached is not None and cached.expires_at > time.monotonic():
+                return cached.response()
+
+            task = _in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(_load(key, func, args, kwargs, ttl))
+                task.add_done_callback(_retrieve)
+                _in_flight[key] = task
+            return (await asyncio.shield(task)).response()
+        return wrapper
+    return decorator
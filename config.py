@@ -0,0 +1,51 @@
+"""
+Configuration
+All settings read from the environment (and .env) in one place. The .env
+file is loaded on the first get_settings() call, not at import time, and the
+Settings object is cached for the life of the process.
+"""
+import os
+import functools
+
+
+def _dsn_list(value: str) -> list:
+    return [dsn.strip() for dsn in (value or "").split(",") if dsn.strip()]
+
+
+class Settings:
+    def __init__(self, env=os.environ):
+        # Database
+        self.db_host = env.get("DB_HOST", "localhost")
+        self.db_port = env.get("DB_PORT", "5432")
+        self.db_name = env.get("DB_NAME", "dynamic_pricing_db")
+        self.db_user = env.get("DB_USER", "postgres")
+        self.db_password = env.get("DB_PASSWORD", "")
+        self.db_primary_dsn = env.get("DB_PRIMARY_DSN") or None
+        self.db_replica_dsns = _dsn_list(env.get("DB_REPLICA_DSNS"))
+        self.db_pool_min = int(env.get("DB_POOL_MIN", "1"))
+        self.db_pool_max = int(env.get("DB_POOL_MAX", "10"))
+        self.replica_max_lag = float(env.get("DB_REPLICA_MAX_LAG", "5"))
+        self.replica_check_interval = float(env.get("DB_REPLICA_CHECK_INTERVAL", "5"))
+        self.replica_retry_seconds = float(env.get("DB_REPLICA_RETRY_SECONDS", "30"))
+        self.sticky_seconds = float(env.get("DB_STICKY_SECONDS", "10"))
+        self.migration_lock_timeout = env.get("MIGRATION_LOCK_TIMEOUT", "5s")
+
+        # Signed tokens
+        self.quote_secret = env.get("QUOTE_SECRET")
+        self.quote_ttl_seconds = int(env.get("QUOTE_TTL_SECONDS", "300"))
+        self.auth_secret = env.get("AUTH_SECRET")
+        self.auth_token_ttl_seconds = int(env.get("AUTH_TOKEN_TTL_SECONDS", "3600"))
+        self.auth_revocation_refresh_seconds = float(env.get("AUTH_REVOCATION_REFRESH_SECONDS", "5"))
+
+        # API
+        self.idempotency_wait_timeout = env.get("IDEMPOTENCY_WAIT_TIMEOUT", "30s")
+        self.admission_max_in_flight = int(env.get("ADMISSION_MAX_IN_FLIGHT", "32"))
+        # Import + startup time of an API worker above which a warning is logged
+        self.startup_budget_ms = float(env.get("STARTUP_BUDGET_MS", "1500"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    from dotenv import load_dotenv
+    load_dotenv()
+    return Settings()
@@ -2,41 +2,311 @@
 Database Connection Module
 PostgreSQL database connection management
 """
-import os
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
-from dotenv import load_dotenv
+from config import get_settings
 
-load_dotenv()
+# Set per request by the API middleware: whether reads may go to a replica
+# and which client the request belongs to (for read-your-writes stickiness).
+_route_reads = ContextVar("route_reads", default=False)
+_client_key = ContextVar("client_key", default=None)
 
+
+class DatabaseTarget:
+    """A primary or replica connection target with health and metrics"""
+
+    def __init__(self, name: str, dsn: str = None, is_replica: bool = False):
+        self.name = name
+        self.dsn = dsn
+        self.is_replica = is_replica
+        self.pool = None
+        self._pooled = set()
+        self.down_until = 0.0
+        self.lag_seconds = 0.0
+        self.lag_checked_at = 0.0
+        self.queries = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def _connect_kwargs(self) -> dict:
+        if self.dsn:
+            return {"dsn": self.dsn, "cursor_factory": RealDictCursor}
+        settings = get_settings()
+        return dict(
+            host=settings.db_host,
+            port=settings.db_port,
+            database=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+            cursor_factory=RealDictCursor
+        )
+
+    def connect(self):
+        return psycopg2.connect(**self._connect_kwargs())
+
+    def open_pool(self, minconn: int, maxconn: int):
+        self.pool = ThreadedConnectionPool(minconn, maxconn, **self._connect_kwargs())
+
+    def close_pool(self):
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    def acquire(self):
+        """Connection for a single query: from the pool if one is open"""
+        if self.pool is not None:
+            try:
+                conn = self.pool.getconn()
+                self._pooled.add(id(conn))
+                return conn
+            except psycopg2.pool.PoolError:
+                pass
+        return self.connect()
+
+    def release(self, conn):
+        if self.pool is not None and id(conn) in self._pooled:
+            self._pooled.discard(id(conn))
+            self.pool.putconn(conn, close=conn.closed != 0)
+        else:
+            conn.close()
+
+    def is_available(self, now: float) -> bool:
+        if now < self.down_until:
+            return False
+        # A replica that was lagging is tried (and re-probed) again once its
+        # lag reading is older than DB_REPLICA_CHECK_INTERVAL
+        settings = get_settings()
+        return (self.lag_seconds <= settings.replica_max_lag
+                or now - self.lag_checked_at >= settings.replica_check_interval)
+
+    def mark_down(self):
+        self.errors += 1
+        self.down_until = time.monotonic() + get_settings().replica_retry_seconds
+
+    def refresh_lag(self, conn):
+        """Re-read replication lag at most every DB_REPLICA_CHECK_INTERVAL seconds"""
+        now = time.monotonic()
+        if now - self.lag_checked_at < get_settings().replica_check_interval:
+            return
+        cursor = conn.cursor()
+        try:
+            # Without writes on the primary the last replayed transaction gets
+            # old while the replica is fully caught up: that counts as no lag
+            cursor.execute("""
+                SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+                       END AS lag
+            """)
+            self.lag_seconds = float(cursor.fetchone()["lag"])
+            self.lag_checked_at = now
+        finally:
+            cursor.close()
+
+    def metrics(self) -> dict:
+        return {
+            "name": self.name,
+            "role": "replica" if self.is_replica else "primary",
+            "healthy": time.monotonic() >= self.down_until,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "queries": self.queries,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.queries, 3) if self.queries else 0.0,
+        }
+
+
+class DatabaseRouter:
+    """Routes writes to the primary and reads round-robin across replicas"""
+
+    def __init__(self, primary_dsn: str = None, replica_dsns: list = None):
+        self.primary = DatabaseTarget("primary", primary_dsn)
+        self.replicas = [
+            DatabaseTarget(f"replica{i + 1}", dsn, is_replica=True)
+            for i, dsn in enumerate(replica_dsns or [])
+        ]
+        self._next = 0
+        self._sticky = {}
+        self._lock = threading.Lock()
+
+    def mark_write(self, client_key):
+        if client_key is None or not self.replicas:
+            return
+        with self._lock:
+            self._sticky[client_key] = time.monotonic() + get_settings().sticky_seconds
+
+    def is_sticky(self, client_key) -> bool:
+        if client_key is None:
+            return False
+        with self._lock:
+            until = self._sticky.get(client_key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._sticky[client_key]
+                return False
+            return True
+
+    def read_targets(self):
+        """Available replicas in round-robin order, primary last as fallback"""
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next += 1
+        count = len(self.replicas)
+        ordered = [self.replicas[(start + i) % count] for i in range(count)]
+        return [t for t in ordered if t.is_available(now)] + [self.primary]
+
+    def connect_for_read(self):
+        """Open a connection on the first healthy, fresh replica (or the primary)"""
+        for target in self.read_targets():
+            if target is self.primary:
+                return target, target.acquire()
+            try:
+                conn = target.acquire()
+            except psycopg2.OperationalError:
+                target.mark_down()
+                continue
+            try:
+                target.refresh_lag(conn)
+            except psycopg2.Error:
+                target.release(conn)
+                target.mark_down()
+                continue
+            if target.lag_seconds > get_settings().replica_max_lag:
+                target.release(conn)
+                continue
+            return target, conn
+
+    def open_pools(self, minconn: int, maxconn: int):
+        for target in [self.primary] + self.replicas:
+            try:
+                target.open_pool(minconn, maxconn)
+            except psycopg2.OperationalError as e:
+                # Queries fall back to one connection each until the target is reachable
+                print(f"[WARN] Connection pool for {target.name} not opened: {e}")
+
+    def close_pools(self):
+        for target in [self.primary] + self.replicas:
+            target.close_pool()
+
+    def metrics(self) -> list:
+        return [t.metrics() for t in [self.primary] + self.replicas]
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> DatabaseRouter:
+    """The process-wide router, built from the settings on first use"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                settings = get_settings()
+                _router = DatabaseRouter(settings.db_primary_dsn, settings.db_replica_dsns)
+    return _router
+
+
+def bind_request(read_only: bool, client_key=None):
+    """Attach routing context for the current request; returns a reset token"""
+    return _route_reads.set(read_only), _client_key.set(client_key)
+
+
+def unbind_request(tokens):
+    route_token, client_token = tokens
+    _route_reads.reset(route_token)
+    _client_key.reset(client_token)
+
+
+def acquire_connection():
+    """Primary connection for a transaction that spans several calls; hand it
+    back with release_connection()"""
+    router = get_router()
+    router.mark_write(_client_key.get())
+    return router.primary.acquire()
+
+
+def release_connection(conn):
+    get_router().primary.release(conn)
+
+
+@contextmanager
 def get_db_connection():
-    """Create database connection"""
-    conn = psycopg2.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        database=os.getenv("DB_NAME", "dynamic_pricing_db"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", ""),
-        cursor_factory=RealDictCursor
-    )
-    return conn
+    """Primary connection for a transaction, from the pool when one is open.
+    Rolled back if the block raises and released when it exits; uncommitted
+    work is discarded."""
+    conn = acquire_connection()
+    try:
+        yield conn
+    except BaseException:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        release_connection(conn)
 
-def execute_query(query: str, params: tuple = None, fetch: bool = True):
-    """Execute SQL query"""
-    conn = get_db_connection()
+
+def init_pool(minconn: int = None, maxconn: int = None):
+    """Open per-process connection pools (called from the app startup hook)"""
+    settings = get_settings()
+    get_router().open_pools(minconn or settings.db_pool_min, maxconn or settings.db_pool_max)
+
+
+def close_pool():
+    get_router().close_pools()
+
+
+def get_target_metrics() -> list:
+    """Per-target query counts, errors, latency and replication lag"""
+    return get_router().metrics()
+
+
+def _run(target, conn, query, params, fetch):
     cursor = conn.cursor()
+    started = time.perf_counter()
     try:
         cursor.execute(query, params)
         if fetch:
             result = cursor.fetchall()
-            conn.commit() 
+            conn.commit()
         else:
             conn.commit()
             result = cursor.rowcount
         return result
     except Exception as e:
-        conn.rollback()
+        # A connection that died mid-query can't roll back; keep the original error
+        if not conn.closed:
+            conn.rollback()
+        target.errors += 1
         raise e
     finally:
+        target.queries += 1
+        target.total_ms += (time.perf_counter() - started) * 1000
         cursor.close()
-        conn.close()
+        target.release(conn)
+
+
+def execute_query(query: str, params: tuple = None, fetch: bool = True):
+    """Execute SQL query"""
+    router = get_router()
+    client_key = _client_key.get()
+    if _route_reads.get() and router.replicas and not router.is_sticky(client_key):
+        target, conn = router.connect_for_read()
+        if target is not router.primary:
+            try:
+                return _run(target, conn, query, params, fetch)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                target.mark_down()
+        else:
+            return _run(target, conn, query, params, fetch)
+
+    result = _run(router.primary, router.primary.acquire(), query, params, fetch)
+    if not _route_reads.get():
+        router.mark_write(client_key)
+    return result
@@ -0,0 +1,212 @@
+"""
+INVENTORY FORECASTING & RESTOCK PLANNING
+----------------------------------------
+Builds a daily demand series per product from OrderItem/"Order", forecasts
+demand for all products at once with NumPy (moving average + exponential
+smoothing), derives Low/HighStockThreshold and a suggested restock quantity,
+and writes it back to Inventory in chunks of --write-chunk products, each in
+its own short transaction.
+
+    python forecast.py                    # run once
+    python forecast.py --interval 60      # re-run every 60 minutes
+
+Products are processed in chunks (--chunk-size) so memory stays bounded:
+one chunk is a (products x days) float32 matrix.
+"""
+import io
+import math
+import time
+import argparse
+import numpy as np
+from database import get_db_connection
+
+
+class ForecastSettings:
+    def __init__(self, history_days: int = 365, window: int = 28, alpha: float = 0.3,
+                 lead_time_days: int = 7, cover_days: int = 30, service_z: float = 1.65,
+                 overstock_factor: float = 1.5, min_low: int = 1, min_high: int = 10):
+        self.history_days = history_days
+        self.window = window
+        self.alpha = alpha
+        self.lead_time_days = lead_time_days
+        self.cover_days = cover_days
+        self.service_z = service_z
+        self.overstock_factor = overstock_factor
+        self.min_low = min_low
+        self.min_high = min_high
+
+
+def copy_array(cur, query: str, params: tuple, columns: int) -> np.ndarray:
+    """Run a query through COPY ... TO STDOUT and parse it as an int array"""
+    buffer = io.StringIO()
+    cur.copy_expert(f"COPY ({cur.mogrify(query, params).decode()}) TO STDOUT WITH (FORMAT csv)", buffer)
+    buffer.seek(0)
+    if not buffer.getvalue():
+        return np.empty((0, columns), dtype=np.int64)
+    return np.loadtxt(buffer, delimiter=",", dtype=np.int64, ndmin=2)
+
+
+def load_products(cur) -> tuple:
+    """Sorted product ids with their current stock"""
+    data = copy_array(cur, """
+        SELECT i.productid, i.stockquantity
+        FROM inventory i
+        JOIN product p ON p.productid = i.productid AND p.deletedat IS NULL
+        ORDER BY i.productid
+    """, (), 2)
+    return data[:, 0], data[:, 1]
+
+
+def load_demand(cur, product_ids: np.ndarray, days: int) -> np.ndarray:
+    """(len(product_ids) x days) matrix of units sold per product per day"""
+    demand = np.zeros((len(product_ids), days), dtype=np.float32)
+    if len(product_ids) == 0:
+        return demand
+    rows = copy_array(cur, """
+        SELECT oi.productid, CURRENT_DATE - o.orderdate::date AS age, SUM(oi.quantity)
+        FROM orderitem oi
+        JOIN "Order" o ON o.orderid = oi.orderid
+        WHERE oi.productid BETWEEN %s AND %s
+          AND o.orderdate >= CURRENT_DATE - %s
+          AND o.status <> 'cancelled'
+        GROUP BY 1, 2
+    """, (int(product_ids[0]), int(product_ids[-1]), days - 1), 3)
+    if len(rows) == 0:
+        return demand
+    index = np.searchsorted(product_ids, rows[:, 0])
+    known = (index < len(product_ids)) & (product_ids[np.minimum(index, len(product_ids) - 1)] == rows[:, 0])
+    known &= (rows[:, 1] >= 0) & (rows[:, 1] < days)
+    # age 0 (today) is the last column
+    demand[index[known], days - 1 - rows[known, 1]] = rows[known, 2]
+    return demand
+
+
+def forecast_demand(demand: np.ndarray, settings: ForecastSettings) -> tuple:
+    """Daily demand forecast and its recent standard deviation, per product"""
+    recent = demand[:, -settings.window:]
+    moving_average = recent.mean(axis=1)
+    sigma = recent.std(axis=1)
+
+    # Exponential smoothing, vectorized across products, one step per day
+    level = demand[:, 0].copy()
+    alpha = np.float32(settings.alpha)
+    for day in range(1, demand.shape[1]):
+        level += alpha * (demand[:, day] - level)
+
+    return (moving_average + level) / 2, sigma
+
+
+def plan_restock(stock: np.ndarray, daily: np.ndarray, sigma: np.ndarray, settings: ForecastSettings) -> tuple:
+    """Low/high thresholds and suggested restock quantity per product"""
+    lead = settings.lead_time_days
+    safety = settings.service_z * sigma * math.sqrt(lead)
+    low = np.maximum(np.ceil(daily * lead + safety), settings.min_low)
+    target = daily * (lead + settings.cover_days) + safety
+    high = np.maximum(np.ceil(target * settings.overstock_factor), np.maximum(low + 1, settings.min_high))
+    restock = np.where(stock < low, np.ceil(target - stock), 0)
+    return low.astype(np.int64), high.astype(np.int64), np.maximum(restock, 0).astype(np.int64)
+
+
+# Thresholds changed: these rows may cross into or out of low/overstock and
+# fire trg_stock_events
+THRESHOLD_UPDATE = """
+    UPDATE inventory i
+    SET lowstockthreshold = f.low,
+        highstockthreshold = f.high,
+        suggestedrestockqty = f.restock,
+        forecastdailydemand = f.daily,
+        forecastedat = NOW()
+    FROM forecast_result f
+    WHERE i.productid = f.productid
+      AND f.productid BETWEEN %s AND %s
+      AND (i.lowstockthreshold, i.highstockthreshold) IS DISTINCT FROM (f.low, f.high)
+"""
+
+# Same thresholds: only the forecast columns, which the trigger doesn't watch
+FORECAST_UPDATE = """
+    UPDATE inventory i
+    SET suggestedrestockqty = f.restock,
+        forecastdailydemand = f.daily,
+        forecastedat = NOW()
+    FROM forecast_result f
+    WHERE i.productid = f.productid
+      AND f.productid BETWEEN %s AND %s
+      AND (i.lowstockthreshold, i.highstockthreshold) = (f.low, f.high)
+      AND (i.suggestedrestockqty, i.forecastdailydemand) IS DISTINCT FROM (f.restock, f.daily)
+"""
+
+
+def write_back(conn, cur, rows: io.StringIO, product_ids: np.ndarray, chunk_size: int = 5_000) -> int:
+    """Apply the forecast chunk by chunk of (sorted) product ids, committing
+    after each, so checkout's stock updates never wait behind more than one
+    chunk's row locks"""
+    cur.execute("DROP TABLE IF EXISTS forecast_result")
+    cur.execute("""
+        CREATE TEMP TABLE forecast_result (
+            productid INTEGER PRIMARY KEY,
+            daily DECIMAL(12, 3),
+            low INTEGER,
+            high INTEGER,
+            restock INTEGER
+        )
+    """)
+    rows.seek(0)
+    cur.copy_expert("COPY forecast_result FROM STDIN WITH (FORMAT csv)", rows)
+    conn.commit()
+
+    updated = 0
+    for start in range(0, len(product_ids), chunk_size):
+        ids = product_ids[start:start + chunk_size]
+        bounds = (int(ids[0]), int(ids[-1]))
+        cur.execute(THRESHOLD_UPDATE, bounds)
+        updated += cur.rowcount
+        cur.execute(FORECAST_UPDATE, bounds)
+        updated += cur.rowcount
+        conn.commit()
+
+    cur.execute("DROP TABLE forecast_result")
+    conn.commit()
+    return updated
+
+
+def run_forecast(settings: ForecastSettings, chunk_size: int = 100_000, write_chunk: int = 5_000):
+    started = time.perf_counter()
+    with get_db_connection() as conn, conn.cursor() as cur:
+        product_ids, stock = load_products(cur)
+        print(f"[INFO] Forecasting {len(product_ids)} products over {settings.history_days} days...")
+
+        results = io.StringIO()
+        for start in range(0, len(product_ids), chunk_size):
+            ids = product_ids[start:start + chunk_size]
+            demand = load_demand(cur, ids, settings.history_days)
+            daily, sigma = forecast_demand(demand, settings)
+            low, high, restock = plan_restock(stock[start:start + chunk_size], daily, sigma, settings)
+            np.savetxt(results, np.column_stack([ids, np.round(daily, 3), low, high, restock]),
+                       fmt=["%d", "%.3f", "%d", "%d", "%d"], delimiter=",")
+            print(f"   {min(start + chunk_size, len(product_ids))}/{len(product_ids)} products "
+                  f"({time.perf_counter() - started:.1f}s)")
+
+        updated = write_back(conn, cur, results, product_ids, write_chunk)
+        print(f"[SUCCESS] {updated} inventory rows updated in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast demand and set restock thresholds")
+    parser.add_argument("--interval", type=float, default=0, help="re-run every N minutes (0 = run once)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--write-chunk", type=int, default=5_000, help="products updated per transaction")
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--lead-time", type=int, default=7, help="supplier lead time in days")
+    parser.add_argument("--cover-days", type=int, default=30, help="days of demand a restock should cover")
+    args = parser.parse_args()
+
+    settings = ForecastSettings(history_days=args.history_days, lead_time_days=args.lead_time,
+                                cover_days=args.cover_days)
+    while True:
+        try:
+            run_forecast(settings, args.chunk_size, args.write_chunk)
+        except Exception as e:
+            print(f"[ERROR] Error: {e}")
+        if not args.interval:
+            break
+        time.sleep(args.interval * 60)
@@ -20,18 +20,15 @@ def clear_database():
     """Clear existing data (optional)"""
     print("[INFO] Cleaning old data...")
     tables = ["OrderItem", "\"Order\"", "PriceHistory", "Inventory", "Product", "Supplier", "Category", "\"User\""]
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        for table in tables:
-            cur.execute(f'TRUNCATE TABLE {table} CASCADE;')
-        conn.commit()
-        print("[OK] Database cleaned.")
-    except Exception as e:
-        print(f"[ERROR] Error: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+    with get_db_connection() as conn, conn.cursor() as cur:
+        try:
+            for table in tables:
+                cur.execute(f'TRUNCATE TABLE {table} CASCADE;')
+            conn.commit()
+            print("[OK] Database cleaned.")
+        except Exception as e:
+            print(f"[ERROR] Error: {e}")
+            conn.rollback()
 
 def generate_users(n=50):
     print(f"[INFO] {n} creating users...")
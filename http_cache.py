@@ -0,0 +1,123 @@
+"""
+HTTP Response Caching
+Cache-Control, ETag and Last-Modified headers for catalog reads, and
+304 Not Modified for clients that already hold the current version.
+Routes stamped by TableVersion (14_table_versions.sql) are revalidated from
+the version counters alone, without running the handler; the others get an
+ETag hashed from the response body, which saves the transfer but not the query.
+"""
+import re
+import time
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from coalescing import coalesce_scope
+from database import bind_request, unbind_request, execute_query
+
+# Version stamps are re-read at most this often per worker
+STAMP_TTL = 1.0
+
+
+class CacheRule:
+    def __init__(self, path: str, cache_control: str, tables: tuple = None):
+        self.pattern = re.compile(path + "$")
+        self.cache_control = cache_control
+        self.tables = tables
+
+
+# First match wins. Staff-only routes are `private` and never answered
+# from the stamp, so the auth dependency always runs.
+RULES = [
+    CacheRule("/api/categories", "public, max-age=30, stale-while-revalidate=300",
+              tables=("category", "product")),
+    CacheRule("/api/suppliers", "private, max-age=30, stale-while-revalidate=300"),
+    CacheRule(r"/api/products/\d+", "public, max-age=10, stale-while-revalidate=60"),
+    CacheRule("/api/products", "public, max-age=5, stale-while-revalidate=30"),
+]
+
+_stamps = {}
+
+
+def match_rule(request: Request):
+    if request.method not in ("GET", "HEAD"):
+        return None
+    path = request.url.path
+    for rule in RULES:
+        if rule.pattern.match(path):
+            return rule
+    return None
+
+
+def table_stamp(tables: tuple):
+    """(etag, last_modified) for the current versions of `tables`"""
+    now = time.monotonic()
+    cached = _stamps.get(tables)
+    if cached is not None and cached[0] > now:
+        return cached[1], cached[2]
+    rows = execute_query(
+        "SELECT tablename, version, changedat FROM tableversion WHERE tablename = ANY(%s) ORDER BY tablename",
+        (list(tables),)
+    )
+    etag = 'W/"' + "-".join(f"{row['tablename']}.{row['version']}" for row in rows) + '"'
+    changed = max((row["changedat"] for row in rows), default=None)
+    last_modified = format_datetime(changed.astimezone(timezone.utc), usegmt=True) if changed else None
+    _stamps[tables] = (now + STAMP_TTL, etag, last_modified)
+    return etag, last_modified
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: gzip (GZipMiddleware) doesn't change the entity
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+async def _read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def http_cache(request: Request, call_next):
+    rule = match_rule(request)
+    if rule is None:
+        return await call_next(request)
+    headers = {"Cache-Control": rule.cache_control}
+
+    if rule.tables:
+        # Stamp and data both come from the primary, read in that order, so a
+        # body is never older than the version it is tagged with
+        tokens = bind_request(False)
+        try:
+            etag, last_modified = await run_in_threadpool(table_stamp, rule.tables)
+            headers["ETag"] = etag
+            if last_modified:
+                headers["Last-Modified"] = last_modified
+            if etag_matches(request, etag):
+                return Response(status_code=304, headers=headers)
+            scope_token = coalesce_scope.set(etag)
+            try:
+                response = await call_next(request)
+            finally:
+                coalesce_scope.reset(scope_token)
+        finally:
+            unbind_request(tokens)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    body = await _read_body(response)
+    headers["ETag"] = 'W/"' + hashlib.md5(body).hexdigest() + '"'
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response_headers = dict(response.headers)
+    response_headers.update(headers)
+    return Response(content=body, status_code=200, headers=response_headers)
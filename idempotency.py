@@ -0,0 +1,141 @@
+"""
+Idempotent Requests
+Replays the stored response when a write is retried with the same
+Idempotency-Key header, instead of executing it again. The handler writes on
+the connection that claimed the key, so its changes and the stored response
+commit (or roll back) together.
+"""
+import asyncio
+import hashlib
+import psycopg2
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from config import get_settings
+from database import acquire_connection, release_connection
+from responses import FastJSONResponse
+
+# (endpoint, key) -> [lock, number of requests holding or waiting for it]
+_local_locks = {}
+
+
+def _claim(endpoint: str, key: str, request_hash: str):
+    """Insert the key row in an open transaction.
+
+    Returns (conn, None) when this request owns the key, or
+    (None, (status_code, body)) when a completed response already exists.
+    The owner's transaction is left at the savepoint idempotent_request; the
+    connection is released by _complete() or _abort().
+    """
+    conn = acquire_connection()
+    cur = conn.cursor()
+    try:
+        # How long a retry waits for the first attempt with the same key to finish
+        cur.execute("SET LOCAL lock_timeout = %s", (get_settings().idempotency_wait_timeout,))
+        cur.execute("""
+            INSERT INTO idempotencykey (endpoint, key, requesthash)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (endpoint, key) DO NOTHING
+            RETURNING key
+        """, (endpoint, key, request_hash))
+        if cur.fetchone():
+            cur.execute("SET LOCAL lock_timeout = DEFAULT")
+            cur.execute("SAVEPOINT idempotent_request")
+            cur.close()
+            return conn, None
+
+        conn.rollback()
+        cur.execute("""
+            SELECT requesthash, statuscode, responsebody FROM idempotencykey
+            WHERE endpoint = %s AND key = %s
+        """, (endpoint, key))
+        row = cur.fetchone()
+    except psycopg2.errors.LockNotAvailable:
+        conn.rollback()
+        release_connection(conn)
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        release_connection(conn)
+        raise
+    release_connection(conn)
+
+    if row["requesthash"] != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    return None, (row["statuscode"], row["responsebody"])
+
+
+def _complete(conn, endpoint: str, key: str, status_code: int, body: bytes, discard_writes: bool = False):
+    """Store the response and commit it with the handler's writes (or, with
+    discard_writes, without them)"""
+    cur = conn.cursor()
+    try:
+        if discard_writes:
+            cur.execute("ROLLBACK TO SAVEPOINT idempotent_request")
+        cur.execute("""
+            UPDATE idempotencykey SET statuscode = %s, responsebody = %s
+            WHERE endpoint = %s AND key = %s
+        """, (status_code, body.decode("utf-8"), endpoint, key))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        release_connection(conn)
+
+
+def _abort(conn):
+    if not conn.closed:
+        conn.rollback()
+    release_connection(conn)
+
+
+async def run_idempotent(endpoint: str, key: str, payload: BaseModel, handler):
+    """Run handler(conn) once per (endpoint, key); retries get the stored response.
+
+    The handler writes through conn without committing; it gets None (and
+    manages its own transaction) when the request carries no key. Client
+    errors (4xx) are stored and replayed too, without the handler's writes.
+    Server errors release the key so the request can be retried.
+    """
+    if not key:
+        return await handler(None)
+
+    request_hash = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+    # Duplicates within this worker queue here instead of holding a DB connection
+    entry = _local_locks.setdefault((endpoint, key), [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            return await _run_once(endpoint, key, request_hash, handler)
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _local_locks[(endpoint, key)]
+
+
+async def _run_once(endpoint: str, key: str, request_hash: str, handler):
+    conn, stored = await run_in_threadpool(_claim, endpoint, key, request_hash)
+    if stored is not None:
+        status_code, body = stored
+        return Response(content=body, status_code=status_code, media_type="application/json",
+                        headers={"Idempotent-Replayed": "true"})
+
+    try:
+        result = await handler(conn)
+    except HTTPException as e:
+        if e.status_code >= 500:
+            await run_in_threadpool(_abort, conn)
+        else:
+            body = FastJSONResponse({"detail": e.detail}).body
+            await run_in_threadpool(_complete, conn, endpoint, key, e.status_code, body, True)
+        raise
+    except BaseException:
+        await run_in_threadpool(_abort, conn)
+        raise
+
+    await run_in_threadpool(_complete, conn, endpoint, key, 200, FastJSONResponse(result).body)
+    return result
@@ -0,0 +1,246 @@
+"""
+SCHEMA MIGRATION RUNNER
+-----------------------
+Applies the numbered SQL files (01_..., 04_..., 05_...) that have not been
+applied yet, in order, and records each one in the SchemaMigration table.
+
+    python migrate.py                 # apply pending migrations
+    python migrate.py status          # list applied / pending migrations
+    python migrate.py baseline 05     # mark 01..05 as applied (existing DBs)
+    python migrate.py indexes         # unused / invalid indexes, seq-scan heavy tables
+
+A migration runs in one transaction, unless it contains CREATE/DROP INDEX
+CONCURRENTLY: then each statement runs on its own in autocommit mode, so the
+index is built without blocking writes on a live database.
+"""
+import os
+import re
+import sys
+import glob
+import hashlib
+import argparse
+from config import get_settings
+from database import get_db_connection
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Numbered files that are sample data or ad-hoc queries, not schema changes
+NOT_MIGRATIONS = {"02_insert_dummy_data.sql", "03_sample_queries.sql"}
+
+CONCURRENTLY = re.compile(r"\b(CREATE|DROP)\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY\b", re.IGNORECASE)
+
+
+class Migration:
+    def __init__(self, path: str):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.version = self.filename.split("_", 1)[0]
+        with open(path, "r", encoding="utf-8") as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+        self.transactional = not CONCURRENTLY.search(self.sql)
+
+
+def load_migrations() -> list:
+    paths = glob.glob(os.path.join(MIGRATIONS_DIR, "[0-9][0-9]_*.sql"))
+    return [Migration(p) for p in sorted(paths) if os.path.basename(p) not in NOT_MIGRATIONS]
+
+
+def split_statements(sql: str) -> list:
+    """Split a plain SQL script on top-level semicolons.
+
+    Handles quotes and -- comments; not meant for $$ function bodies, which
+    only appear in transactional migrations (run as a single script).
+    """
+    statements, current = [], []
+    in_quote = None
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if in_quote:
+            current.append(ch)
+            if ch == in_quote:
+                in_quote = None
+        elif ch in ("'", '"'):
+            in_quote = ch
+            current.append(ch)
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif ch == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statements.append("".join(current).strip())
+    return [s for s in statements if s]
+
+
+def ensure_table(conn):
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigration (
+            Version VARCHAR(20) PRIMARY KEY,
+            Filename VARCHAR(255) NOT NULL,
+            Checksum CHAR(64) NOT NULL,
+            AppliedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+    cur.close()
+
+
+def applied_versions(conn) -> dict:
+    cur = conn.cursor()
+    cur.execute("SELECT version, filename, checksum, appliedat FROM schemamigration ORDER BY version")
+    rows = {row["version"]: row for row in cur.fetchall()}
+    conn.commit()
+    cur.close()
+    return rows
+
+
+def record(cur, migration: Migration):
+    cur.execute("""
+        INSERT INTO schemamigration (version, filename, checksum) VALUES (%s, %s, %s)
+        ON CONFLICT (version) DO NOTHING
+    """, (migration.version, migration.filename, migration.checksum))
+
+
+def apply_migration(conn, migration: Migration):
+    cur = conn.cursor()
+    if migration.transactional:
+        try:
+            # Fail fast instead of queueing behind long transactions (and blocking checkout)
+            cur.execute("SET LOCAL lock_timeout = %s", (get_settings().migration_lock_timeout,))
+            cur.execute(migration.sql)
+            record(cur, migration)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        return
+
+    conn.autocommit = True
+    try:
+        cur.execute("SET lock_timeout = %s", (get_settings().migration_lock_timeout,))
+        for statement in split_statements(migration.sql):
+            print(f"   {statement.splitlines()[0]}")
+            cur.execute(statement)
+        record(cur, migration)
+    except Exception:
+        print("[HINT] A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind; "
+              "drop it (see `python migrate.py indexes`) before re-running.")
+        raise
+    finally:
+        cur.execute("RESET lock_timeout")
+        conn.autocommit = False
+        cur.close()
+
+
+def migrate(conn):
+    done = applied_versions(conn)
+    pending = [m for m in load_migrations() if m.version not in done]
+    if not pending:
+        print("[OK] Database is up to date.")
+        return
+    for migration in pending:
+        mode = "transaction" if migration.transactional else "autocommit, concurrent"
+        print(f"[INFO] Applying {migration.filename} ({mode})...")
+        apply_migration(conn, migration)
+    print(f"[SUCCESS] {len(pending)} migration(s) applied.")
+
+
+def status(conn):
+    done = applied_versions(conn)
+    for migration in load_migrations():
+        row = done.get(migration.version)
+        if row is None:
+            print(f"  [PENDING] {migration.filename}")
+        elif row["checksum"] != migration.checksum:
+            print(f"  [CHANGED] {migration.filename} (applied {row['appliedat']:%Y-%m-%d %H:%M}, file edited since)")
+        else:
+            print(f"  [APPLIED] {migration.filename} ({row['appliedat']:%Y-%m-%d %H:%M})")
+
+
+def baseline(conn, version: str):
+    cur = conn.cursor()
+    marked = [m for m in load_migrations() if m.version <= version]
+    for migration in marked:
+        record(cur, migration)
+    conn.commit()
+    cur.close()
+    print(f"[OK] Marked {len(marked)} migration(s) up to {version} as applied.")
+
+
+def index_report(conn):
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT s.relname AS table_name, s.indexrelname AS index_name, s.idx_scan,
+               pg_size_pretty(pg_relation_size(s.indexrelid)) AS size
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+        ORDER BY pg_relation_size(s.indexrelid) DESC
+    """)
+    unused = cur.fetchall()
+    print("[INFO] Unused indexes (no scans since stats reset):")
+    for row in unused or [{"table_name": "-", "index_name": "none", "size": "-"}]:
+        print(f"   {row['table_name']:<15} {row['index_name']:<45} {row['size']}")
+
+    cur.execute("""
+        SELECT c.relname AS index_name, t.relname AS table_name
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE NOT i.indisvalid
+    """)
+    invalid = cur.fetchall()
+    print("[INFO] Invalid indexes (failed concurrent builds, drop and re-run):")
+    for row in invalid or [{"table_name": "-", "index_name": "none"}]:
+        print(f"   {row['table_name']:<15} {row['index_name']}")
+
+    cur.execute("""
+        SELECT relname AS table_name, seq_scan, seq_tup_read, COALESCE(idx_scan, 0) AS idx_scan, n_live_tup
+        FROM pg_stat_user_tables
+        WHERE seq_scan > COALESCE(idx_scan, 0) AND n_live_tup > 1000
+        ORDER BY seq_tup_read DESC
+        LIMIT 10
+    """)
+    heavy = cur.fetchall()
+    print("[INFO] Tables read mostly by sequential scans (missing index candidates):")
+    for row in heavy or [{"table_name": "none", "seq_scan": "-", "idx_scan": "-", "n_live_tup": "-"}]:
+        print(f"   {row['table_name']:<15} seq_scan={row['seq_scan']} idx_scan={row['idx_scan']} rows={row['n_live_tup']}")
+    cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply and inspect schema migrations")
+    parser.add_argument("command", nargs="?", default="up", choices=["up", "status", "baseline", "indexes"])
+    parser.add_argument("version", nargs="?", help="last version to mark as applied (baseline)")
+    args = parser.parse_args(argv)
+
+    try:
+        with get_db_connection() as conn:
+            if args.command == "indexes":
+                index_report(conn)
+                return
+            ensure_table(conn)
+            if args.command == "status":
+                status(conn)
+            elif args.command == "baseline":
+                if not args.version:
+                    parser.error("baseline needs a version, e.g. `python migrate.py baseline 05`")
+                baseline(conn, args.version)
+            else:
+                migrate(conn)
+    except Exception as e:
+        print(f"[ERROR] Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Order Lifecycle
+Moves orders through pending -> processing -> completed / cancelled in
+batches: one statement validates and applies every transition, puts the
+stock of cancelled orders back, and reports what was rejected. Revenue
+aggregates (RevenueDaily) follow through the triggers in 13_order_lifecycle.sql.
+"""
+import psycopg2
+from database import get_db_connection
+
+# (from, to) pairs that are allowed
+TRANSITIONS = [
+    ("pending", "processing"),
+    ("pending", "cancelled"),
+    ("processing", "completed"),
+    ("processing", "cancelled"),
+]
+
+MAX_DEADLOCK_RETRIES = 3
+
+TRANSITION_QUERY = """
+    WITH requested AS (
+        -- The last update for an order in the batch wins
+        SELECT DISTINCT ON (orderid) orderid, status
+        FROM unnest(%(order_ids)s::int[], %(statuses)s::text[]) WITH ORDINALITY AS r(orderid, status, n)
+        ORDER BY orderid, n DESC
+    ),
+    allowed AS (
+        SELECT * FROM unnest(%(from_statuses)s::text[], %(to_statuses)s::text[]) AS a(from_status, to_status)
+    ),
+    changed AS (
+        UPDATE "Order" o
+        SET status = r.status, statuschangedat = NOW()
+        FROM requested r, allowed a
+        WHERE o.orderid = r.orderid
+          AND a.from_status = o.status
+          AND a.to_status = r.status
+        RETURNING o.orderid, o.status
+    ),
+    restocked AS (
+        UPDATE inventory i
+        SET stockquantity = i.stockquantity + q.quantity
+        FROM (
+            SELECT oi.productid, SUM(oi.quantity) AS quantity
+            FROM orderitem oi
+            JOIN changed c ON c.orderid = oi.orderid
+            WHERE c.status = 'cancelled'
+            GROUP BY oi.productid
+        ) q
+        WHERE i.productid = q.productid
+        RETURNING i.productid
+    )
+    SELECT r.orderid, r.status, o.status AS previous_status,
+           c.orderid IS NOT NULL AS applied,
+           (SELECT COUNT(*) FROM restocked) AS restocked_products
+    FROM requested r
+    LEFT JOIN "Order" o ON o.orderid = r.orderid
+    LEFT JOIN changed c ON c.orderid = r.orderid
+    ORDER BY r.orderid
+"""
+
+
+def transition_orders(updates: list) -> dict:
+    """Apply [(order_id, status), ...]; returns applied and rejected orders"""
+    if not updates:
+        return {"applied": [], "rejected": [], "restocked_products": 0}
+    params = {
+        "order_ids": [order_id for order_id, _ in updates],
+        "statuses": [status for _, status in updates],
+        "from_statuses": [old for old, _ in TRANSITIONS],
+        "to_statuses": [new for _, new in TRANSITIONS],
+    }
+
+    for attempt in range(MAX_DEADLOCK_RETRIES):
+        try:
+            with get_db_connection() as conn, conn.cursor() as cur:
+                cur.execute(TRANSITION_QUERY, params)
+                rows = cur.fetchall()
+                conn.commit()
+            break
+        except psycopg2.errors.DeadlockDetected:
+            # Overlapping batches lock orders/inventory in different orders
+            if attempt == MAX_DEADLOCK_RETRIES - 1:
+                raise
+
+    applied, rejected = [], []
+    for row in rows:
+        if row["applied"]:
+            applied.append({"order_id": row["orderid"], "status": row["status"],
+                            "previous_status": row["previous_status"]})
+        elif row["previous_status"] is None:
+            rejected.append({"order_id": row["orderid"], "reason": "Order not found"})
+        else:
+            rejected.append({"order_id": row["orderid"],
+                             "reason": f"Cannot move from {row['previous_status']} to {row['status']}"})
+    return {
+        "applied": applied,
+        "rejected": rejected,
+        "restocked_products": rows[0]["restocked_products"] if rows else 0,
+    }
@@ -0,0 +1,28 @@
+"""
+Price Quotes
+Signed, short-lived cart price quotes. A quote token carries the priced cart
+so checkout can trust the prices without re-reading them from the database.
+"""
+import functools
+from config import get_settings
+from signing import load_secret, sign, unsign
+
+
+@functools.lru_cache(maxsize=None)
+def _secret() -> bytes:
+    return load_secret(get_settings().quote_secret, "QUOTE_SECRET")
+
+
+def sign_quote(payload: dict) -> tuple:
+    """Add an expiry to payload and return (token, expires_at)"""
+    return sign(_secret(), payload, get_settings().quote_ttl_seconds, "quote")
+
+
+def verify_quote(token: str):
+    """Payload of a valid, unexpired token, otherwise None"""
+    return unsign(_secret(), token, "quote")
+
+
+def cart_key(items) -> list:
+    """Order-independent (product_id, quantity) list for comparing carts"""
+    return sorted((int(item["product_id"]), int(item["quantity"])) for item in items)
@@ -0,0 +1,104 @@
+"""
+Repositories
+Data access shared by the API routers and the command-line tools; no FastAPI
+imports, so scripts can use them without loading the web stack.
+Larger areas have their own modules (users, order_lifecycle, stock_events,
+idempotency).
+"""
+from datetime import datetime
+from typing import Optional, List
+from database import execute_query
+
+PRICE_AS_OF_QUERY = """
+    SELECT p.productid, p.title,
+           COALESCE(
+               (SELECT ph.newprice FROM pricehistory ph
+                WHERE ph.productid = p.productid AND ph.changedate <= %(at)s
+                ORDER BY ph.changedate DESC, ph.historyid DESC LIMIT 1),
+               (SELECT ph.oldprice FROM pricehistory ph
+                WHERE ph.productid = p.productid AND ph.changedate > %(at)s
+                ORDER BY ph.changedate ASC, ph.historyid ASC LIMIT 1),
+               p.currentprice
+           ) AS price,
+           %(at)s AS at
+    FROM product p
+    WHERE p.productid = ANY(%(ids)s)
+    ORDER BY p.productid
+"""
+
+def fetch_prices_as_of(product_ids: List[int], at: Optional[datetime] = None):
+    """Effective price of each product at time `at` (now if omitted).
+
+    The latest PriceHistory change at or before `at` wins; before the first
+    recorded change the product still had that change's old price; products
+    without history have always had their current price.
+    """
+    return execute_query(PRICE_AS_OF_QUERY, {"ids": list(product_ids), "at": at or datetime.now()})
+
+PRODUCT_DETAIL_QUERY = """
+    SELECT p.*, c.categoryname, s.companyname,
+           i.stockquantity, i.lowstockthreshold, i.highstockthreshold
+    FROM product p
+    LEFT JOIN category c ON p.categoryid = c.categoryid
+    LEFT JOIN supplier s ON p.supplierid = s.supplierid
+    LEFT JOIN inventory i ON p.productid = i.productid
+    WHERE p.productid = ANY(%s) AND p.deletedat IS NULL
+"""
+
+def fetch_products(product_ids: List[int]) -> dict:
+    """{product_id: product with category, supplier and stock} for the live
+    products among product_ids, in one query"""
+    rows = execute_query(PRODUCT_DETAIL_QUERY, (list(product_ids),))
+    return {row["productid"]: row for row in rows}
+
+def fetch_orders(order_ids: List[int]) -> dict:
+    """{order_id: order with customer and items}: one query for the orders
+    and one for all of their items"""
+    orders = execute_query("""
+        SELECT o.*, u.fullname, u.email
+        FROM "Order" o
+        INNER JOIN "User" u ON o.userid = u.userid
+        WHERE o.orderid = ANY(%s)
+    """, (list(order_ids),))
+    result = {}
+    for order in orders:
+        order = dict(order)
+        order["items"] = []
+        result[order["orderid"]] = order
+    if result:
+        items = execute_query("""
+            SELECT oi.*, p.title
+            FROM orderitem oi
+            INNER JOIN product p ON oi.productid = p.productid
+            WHERE oi.orderid = ANY(%s)
+            ORDER BY oi.orderid, oi.itemid
+        """, (list(result),))
+        for item in items:
+            result[item["orderid"]]["items"].append(item)
+    return result
+
+def delete_products(product_ids: List[int], hard: bool = False):
+    """Archive products (default) or delete them with their inventory, price
+    history and order items; returns the ids that were affected."""
+    if hard:
+        query = "DELETE FROM product WHERE productid = ANY(%s) RETURNING productid"
+    else:
+        query = """
+            UPDATE product SET deletedat = NOW(), isactive = FALSE
+            WHERE productid = ANY(%s) AND deletedat IS NULL
+            RETURNING productid
+        """
+    return [row["productid"] for row in execute_query(query, (list(product_ids),))]
+
+def delete_users(user_ids: List[int], hard: bool = False):
+    """Archive users (default) or delete them with their orders; returns the
+    ids that were affected."""
+    if hard:
+        query = 'DELETE FROM "User" WHERE userid = ANY(%s) RETURNING userid'
+    else:
+        query = '''
+            UPDATE "User" SET deletedat = NOW(), tokensvalidafter = NOW()
+            WHERE userid = ANY(%s) AND deletedat IS NULL
+            RETURNING userid
+        '''
+    return [row["userid"] for row in execute_query(query, (list(user_ids),))]
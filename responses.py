@@ -0,0 +1,40 @@
+"""
+Fast JSON Responses
+Serializes query results (RealDictRow lists with Decimal/datetime values)
+directly, skipping FastAPI's per-row jsonable_encoder pass.
+"""
+import json
+from decimal import Decimal
+from datetime import date, datetime, time
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _decimal(value: Decimal):
+    # Same output as FastAPI's decimal encoder: whole numbers as int, others as float
+    if value.as_tuple().exponent >= 0:
+        return int(value)
+    return float(value)
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return _decimal(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes rows in one pass (orjson when installed)"""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
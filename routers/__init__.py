@@ -0,0 +1,5 @@
+"""
+API Routers
+One APIRouter per area, included by main.py.
+"""
+
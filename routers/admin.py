@@ -0,0 +1,113 @@
+"""
+Dashboards and operational metrics
+"""
+from fastapi import APIRouter
+from database import execute_query, get_target_metrics
+from responses import FastJSONResponse
+from coalescing import coalesce
+from admission import admission_metrics
+from routers.deps import ADMIN
+
+router = APIRouter()
+
+@router.get("/api/admission", dependencies=ADMIN)
+async def get_admission_metrics():
+    return admission_metrics()
+
+@router.get("/api/db/targets", dependencies=ADMIN)
+async def get_db_targets():
+    return {"targets": get_target_metrics()}
+
+@router.get("/api/dashboard/stats", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_dashboard_stats():
+    stats = {}
+    
+    stats["total_products"] = execute_query("SELECT COUNT(*) as count FROM product WHERE deletedat IS NULL")[0]["count"]
+    
+    stats["total_categories"] = execute_query("SELECT COUNT(*) as count FROM category")[0]["count"]
+    
+    stats["total_orders"] = execute_query('SELECT COUNT(*) as count FROM "Order"')[0]["count"]
+    
+    revenue = execute_query("SELECT COALESCE(SUM(revenue), 0) as total FROM revenuedaily")
+    stats["total_revenue"] = float(revenue[0]["total"])
+    
+    low_stock = execute_query("""
+        SELECT COUNT(*) as count FROM inventory i
+        JOIN product p ON i.productid = p.productid AND p.deletedat IS NULL
+        WHERE i.stockquantity < i.lowstockthreshold
+    """)
+    stats["low_stock_count"] = low_stock[0]["count"]
+    
+    avg_price = execute_query("SELECT COALESCE(AVG(currentprice), 0) as avg FROM product WHERE deletedat IS NULL")
+    stats["average_price"] = round(float(avg_price[0]["avg"]), 2)
+    
+    return stats
+
+@router.get("/api/dashboard/category-distribution", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_category_distribution():
+    query = """
+        SELECT c.categoryname as name, COUNT(p.productid) as value
+        FROM category c
+        LEFT JOIN product p ON c.categoryid = p.categoryid AND p.deletedat IS NULL
+        GROUP BY c.categoryid, c.categoryname
+        ORDER BY value DESC
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/dashboard/price-trends", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_price_trends():
+    query = """
+        SELECT DATE(changedate) as date, 
+               COUNT(*) as changes,
+               AVG(newprice - oldprice) as avg_change
+        FROM pricehistory
+        GROUP BY DATE(changedate)
+        ORDER BY date DESC
+        LIMIT 30
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/dashboard/supplier-revenue", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_supplier_revenue():
+    query = """
+        SELECT s.companyname, SUM(oi.quantity * oi.unitprice) as total_revenue
+        FROM orderitem oi
+        JOIN product p ON oi.productid = p.productid
+        JOIN supplier s ON p.supplierid = s.supplierid
+        JOIN "Order" o ON oi.orderid = o.orderid
+        WHERE o.status != 'cancelled'
+        GROUP BY s.supplierid, s.companyname
+        ORDER BY total_revenue DESC
+        LIMIT 5
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/dashboard/monthly-revenue", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_monthly_revenue():
+    query = """
+        SELECT TO_CHAR(day, 'YYYY-MM') as month, SUM(revenue) as revenue
+        FROM revenuedaily
+        GROUP BY month
+        ORDER BY month DESC
+        LIMIT 12
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/dashboard/vip-users", dependencies=ADMIN)
+@coalesce(ttl=5.0)
+def get_vip_users():
+    query = """
+        SELECT u.fullname, u.email, COUNT(o.orderid) as order_count, SUM(o.totalamount) as total_spent
+        FROM "User" u
+        JOIN "Order" o ON u.userid = o.userid
+        WHERE o.status = 'completed'
+        GROUP BY u.userid, u.fullname, u.email
+        ORDER BY total_spent DESC
+        LIMIT 5
+    """
+    return FastJSONResponse(execute_query(query))
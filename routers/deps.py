@@ -0,0 +1,28 @@
+"""
+Shared route dependencies
+"""
+from typing import List
+from fastapi import Depends, HTTPException
+from auth import require_role
+
+# Route guards
+ADMIN = [Depends(require_role("admin"))]
+STAFF = [Depends(require_role("admin", "seller"))]
+
+
+# Ids resolved by one multi-get request
+MAX_BATCH_IDS = 1000
+
+def batch_ids(ids: List[int]) -> List[int]:
+    """Distinct ids in request order; 400 if there are too many"""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return ids
+
+def keyed(found: dict, ids: List[int], name: str) -> dict:
+    """Multi-get response body: results keyed by id plus the ids not found"""
+    return {
+        name: {i: found[i] for i in ids if i in found},
+        "missing": [i for i in ids if i not in found],
+    }
@@ -0,0 +1,98 @@
+"""
+Inventory, stock events and price history
+"""
+from typing import Optional
+from fastapi import APIRouter, Query
+from database import execute_query
+from responses import FastJSONResponse
+from stock_events import fetch_events
+from schemas import InventoryUpdate
+from routers.deps import STAFF
+
+router = APIRouter()
+
+@router.get("/api/inventory", dependencies=STAFF)
+def get_inventory():
+    query = """
+        SELECT i.*, p.title, p.currentprice,
+               CASE 
+                   WHEN i.stockquantity < i.lowstockthreshold THEN 'LOW'
+                   WHEN i.stockquantity > i.highstockthreshold THEN 'HIGH'
+                   ELSE 'NORMAL'
+               END as stock_status
+        FROM inventory i
+        INNER JOIN product p ON i.productid = p.productid AND p.deletedat IS NULL
+        ORDER BY i.stockquantity ASC
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/inventory/low-stock", dependencies=STAFF)
+def get_low_stock(limit: Optional[int] = None):
+    query = """
+        SELECT i.*, p.title, p.currentprice
+        FROM inventory i
+        INNER JOIN product p ON i.productid = p.productid AND p.deletedat IS NULL
+        WHERE i.stockquantity < i.lowstockthreshold
+        ORDER BY i.stockquantity ASC
+    """
+    params = []
+    
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+        
+    return FastJSONResponse(execute_query(query, tuple(params) if params else None))
+
+@router.get("/api/inventory/events", dependencies=STAFF)
+async def get_stock_events(
+    since: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=30)
+):
+    # Long poll: with wait > 0 the request returns as soon as a new event is committed
+    events = await fetch_events(since, limit, wait)
+    return FastJSONResponse({
+        "events": events,
+        "next_since": events[-1]["eventid"] if events else since
+    })
+
+@router.put("/api/inventory/{product_id}", dependencies=STAFF)
+def update_inventory(product_id: int, inventory: InventoryUpdate):
+    query = """
+        UPDATE inventory 
+        SET stockquantity = %s, lowstockthreshold = %s, highstockthreshold = %s, lastrestockdate = CURRENT_DATE
+        WHERE productid = %s
+    """
+    result = execute_query(query, (
+        inventory.stock_quantity, inventory.low_stock_threshold, 
+        inventory.high_stock_threshold, product_id
+    ), fetch=False)
+    
+    if result == 0:
+        insert_query = """
+            INSERT INTO inventory (productid, stockquantity, lowstockthreshold, highstockthreshold, lastrestockdate)
+            VALUES (%s, %s, %s, %s, CURRENT_DATE)
+        """
+        execute_query(insert_query, (
+            product_id, inventory.stock_quantity, 
+            inventory.low_stock_threshold, inventory.high_stock_threshold
+        ), fetch=False)
+    
+    return {"message": "Stock updated"}
+
+@router.get("/api/price-history", dependencies=STAFF)
+def get_price_history(product_id: Optional[int] = None):
+    query = """
+        SELECT ph.*, p.title
+        FROM pricehistory ph
+        INNER JOIN product p ON ph.productid = p.productid
+    """
+    params = []
+    
+    if product_id:
+        query += " WHERE ph.productid = %s"
+        params.append(product_id)
+    
+    query += " ORDER BY ph.changedate DESC"
+    
+    return FastJSONResponse(execute_query(query, tuple(params) if params else None))
@@ -0,0 +1,226 @@
+"""
+Orders, cart quotes and the order status lifecycle
+"""
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Query, Header, Depends
+from starlette.concurrency import run_in_threadpool
+from psycopg2.extras import execute_values
+from database import execute_query, get_db_connection
+from responses import FastJSONResponse
+from quotes import sign_quote, verify_quote, cart_key
+from idempotency import run_idempotent
+from order_lifecycle import transition_orders
+from auth import current_user
+from repositories import fetch_orders
+from schemas import CartItem, OrderCreate, QuoteCreate, OrderStatusBatch, IdBatch
+from routers.deps import ADMIN, STAFF, batch_ids, keyed
+
+router = APIRouter()
+
+@router.get("/api/orders", dependencies=ADMIN)
+def get_orders(
+    user_id: Optional[int] = None, 
+    status: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=100)
+):
+    offset = (page - 1) * limit
+    
+    # Base query for counting
+    count_query = 'SELECT COUNT(*) as total FROM "Order" o WHERE 1=1'
+    count_params = []
+    
+    if user_id:
+        count_query += " AND o.userid = %s"
+        count_params.append(user_id)
+    if status:
+        count_query += " AND o.status = %s"
+        count_params.append(status)
+        
+    total_count = execute_query(count_query, tuple(count_params) if count_params else None)[0]["total"]
+
+    # Main query for fetching data
+    query = """
+        SELECT o.orderid, o.orderdate, o.status, o.totalamount, o.shippingaddress,
+               u.fullname as customer_name,
+               (SELECT string_agg(p.title || ' x' || oi.quantity, ', ')
+                FROM OrderItem oi
+                INNER JOIN Product p ON oi.productid = p.productid
+                WHERE oi.orderid = o.orderid) as order_items,
+               (SELECT string_agg(DISTINCT s.companyname, ', ')
+                FROM OrderItem oi
+                INNER JOIN Product p ON oi.productid = p.productid
+                LEFT JOIN Supplier s ON p.supplierid = s.supplierid
+                WHERE oi.orderid = o.orderid AND s.companyname IS NOT NULL) as suppliers
+        FROM "Order" o
+        INNER JOIN "User" u ON o.userid = u.userid
+        WHERE 1=1
+    """
+    params = []
+    
+    if user_id:
+        query += " AND o.userid = %s"
+        params.append(user_id)
+    if status:
+        query += " AND o.status = %s"
+        params.append(status)
+    
+    query += " ORDER BY o.orderdate DESC, o.orderid DESC LIMIT %s OFFSET %s"
+    params.append(limit)
+    params.append(offset)
+    
+    orders = execute_query(query, tuple(params) if params else None)
+    
+    return FastJSONResponse({
+        "orders": orders,
+        "total": total_count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total_count + limit - 1) // limit
+    })
+
+def price_cart(items: List[CartItem]):
+    """Price a cart and check stock with one query for all of its products"""
+    quantities = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+    rows = execute_query("""
+        SELECT p.productid, p.currentprice, i.stockquantity
+        FROM product p
+        JOIN inventory i ON p.productid = i.productid
+        WHERE p.productid = ANY(%s) AND p.deletedat IS NULL
+    """, (list(quantities),))
+    products = {row["productid"]: row for row in rows}
+
+    total_amount = Decimal("0")
+    valid_items = []
+    for item in items:
+        product_id, quantity = item.product_id, item.quantity
+        product_data = products.get(product_id)
+
+        if not product_data:
+            raise HTTPException(status_code=404, detail=f"Product ID {product_id} not found")
+        if product_data["stockquantity"] < quantities[product_id]:
+            raise HTTPException(status_code=400, detail=f"Insufficient stock for Product ID {product_id} (Available: {product_data['stockquantity']})")
+
+        total_amount += product_data["currentprice"] * quantity
+        valid_items.append({
+            "product_id": product_id,
+            "quantity": quantity,
+            "unit_price": product_data["currentprice"]
+        })
+    return valid_items, total_amount
+
+@router.post("/api/quotes")
+def create_quote(quote: QuoteCreate):
+    valid_items, total_amount = price_cart(quote.items)
+    token, expires_at = sign_quote({
+        "user_id": quote.user_id,
+        "items": [{**item, "unit_price": str(item["unit_price"])} for item in valid_items],
+        "total": str(total_amount)
+    })
+    return FastJSONResponse({
+        "token": token,
+        "expires_at": datetime.fromtimestamp(expires_at),
+        "items": valid_items,
+        "total": total_amount
+    })
+
+def quoted_cart(order: OrderCreate):
+    """Items and total from the order's quote token if it is valid for this cart"""
+    if not order.quote_token:
+        return None
+    quote = verify_quote(order.quote_token)
+    if quote is None or quote["user_id"] not in (None, order.user_id):
+        return None
+    if cart_key(quote["items"]) != cart_key(item.model_dump() for item in order.items):
+        return None
+    items = [{**item, "unit_price": Decimal(item["unit_price"])} for item in quote["items"]]
+    return items, Decimal(quote["total"])
+
+@router.post("/api/orders")
+async def create_order(order: OrderCreate, idempotency_key: Optional[str] = Header(None),
+                       claims: dict = Depends(current_user)):
+    if order.user_id != claims["sub"] and claims["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Orders can only be placed for your own account")
+    async def create(conn):
+        return await run_in_threadpool(_create_order, order, conn)
+    return await run_idempotent("orders", idempotency_key, order, create)
+
+def _create_order(order: OrderCreate, conn=None):
+    """Place the order on conn (left uncommitted, see run_idempotent) or,
+    without one, in a transaction of its own"""
+    # A valid quote already fixed the prices; only the stock check hits the DB
+    quoted = quoted_cart(order)
+    valid_items, total_amount = quoted if quoted else price_cart(order.items)
+
+    quantities = {}
+    for item in valid_items:
+        quantities[item["product_id"]] = quantities.get(item["product_id"], 0) + item["quantity"]
+
+    own_conn = conn is None
+    with (get_db_connection() if own_conn else nullcontext(conn)) as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE inventory i
+            SET stockquantity = i.stockquantity - v.quantity, lastrestockdate = CURRENT_DATE
+            FROM unnest(%s::int[], %s::int[]) AS v(productid, quantity), product p
+            WHERE i.productid = v.productid AND i.stockquantity >= v.quantity
+              AND p.productid = i.productid AND p.deletedat IS NULL
+            RETURNING i.productid
+        """, (list(quantities), list(quantities.values())))
+        updated = {row["productid"] for row in cur.fetchall()}
+        missing = [pid for pid in quantities if pid not in updated]
+        if missing:
+            # A quote may name a product archived since it was issued
+            cur.execute("SELECT productid FROM product WHERE productid = ANY(%s) AND deletedat IS NULL", (missing,))
+            live = {row["productid"] for row in cur.fetchall()}
+            archived = [pid for pid in missing if pid not in live]
+            if archived:
+                raise HTTPException(status_code=404, detail=f"Product ID {archived[0]} not found")
+            raise HTTPException(status_code=400, detail=f"Insufficient stock for Product ID {missing[0]}")
+
+        cur.execute("""
+            INSERT INTO "Order" (userid, orderdate, status, totalamount, shippingaddress)
+            VALUES (%s, CURRENT_DATE, 'pending', %s, %s)
+            RETURNING orderid
+        """, (order.user_id, total_amount, order.shipping_address))
+        new_order_id = cur.fetchone()["orderid"]
+
+        execute_values(cur, """
+            INSERT INTO orderitem (orderid, productid, quantity, unitprice) VALUES %s
+        """, [(new_order_id, item["product_id"], item["quantity"], item["unit_price"]) for item in valid_items])
+        if own_conn:
+            conn.commit()
+
+    return {"message": "Order created", "order_id": new_order_id}
+
+MAX_STATUS_BATCH = 10000
+
+@router.post("/api/orders/status", dependencies=STAFF)
+def update_order_statuses(batch: OrderStatusBatch):
+    """Move many orders along pending -> processing -> completed/cancelled;
+    cancelling puts the items back in stock"""
+    if len(batch.updates) > MAX_STATUS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_BATCH} updates per request")
+    updates = [(u.order_id, u.status) for u in batch.updates]
+    return transition_orders(updates)
+
+@router.post("/api/orders/batch")
+def get_orders_batch(batch: IdBatch, claims: dict = Depends(current_user)):
+    order_ids = batch_ids(batch.ids)
+    orders = fetch_orders(order_ids)
+    if claims["role"] != "admin":
+        # Other customers' orders are reported missing, as in GET /api/orders/{id}
+        orders = {oid: o for oid, o in orders.items() if o["userid"] == claims["sub"]}
+    return FastJSONResponse(keyed(orders, order_ids, "orders"))
+
+@router.get("/api/orders/{order_id}")
+def get_order(order_id: int, claims: dict = Depends(current_user)):
+    order = fetch_orders([order_id]).get(order_id)
+    if order is None or (order["userid"] != claims["sub"] and claims["role"] != "admin"):
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
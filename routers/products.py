@@ -0,0 +1,228 @@
+"""
+Products, campaigns, as-of prices and categories
+"""
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header
+from starlette.concurrency import run_in_threadpool
+from database import execute_query, get_db_connection
+from responses import FastJSONResponse
+from idempotency import run_idempotent
+from coalescing import coalesce
+from repositories import fetch_prices_as_of, fetch_products, delete_products
+from schemas import ProductCreate, ProductUpdate, CategoryCreate, CampaignCreate, PriceLookup, BulkDelete, IdBatch
+from routers.deps import ADMIN, STAFF, batch_ids, keyed
+
+router = APIRouter()
+
+@router.get("/api/products")
+@coalesce(ttl=1.0)
+def get_products(
+    category_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_stock: Optional[int] = None,
+    search: Optional[str] = None,
+    ids: Optional[str] = None
+):
+    if ids is not None:
+        # ?ids=1,2,3: the same lookup as POST /api/products/batch
+        try:
+            product_ids = [int(i) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+        return _products_by_id(product_ids)
+
+    query = """
+        SELECT p.*, c.categoryname as category_name, s.companyname as supplier_name, i.stockquantity
+        FROM product p
+        LEFT JOIN category c ON p.categoryid = c.categoryid
+        LEFT JOIN supplier s ON p.supplierid = s.supplierid
+        LEFT JOIN inventory i ON p.productid = i.productid
+        WHERE p.deletedat IS NULL
+    """
+    params = []
+    
+    if category_id:
+        query += " AND p.categoryid = %s"
+        params.append(category_id)
+    if is_active is not None:
+        query += " AND p.isactive = %s"
+        params.append(is_active)
+    if min_price:
+        query += " AND p.currentprice >= %s"
+        params.append(min_price)
+    if max_price:
+        query += " AND p.currentprice <= %s"
+        params.append(max_price)
+    if min_stock is not None:
+        query += " AND i.stockquantity >= %s"
+        params.append(min_stock)
+    if search:
+        query += " AND (p.title ILIKE %s OR p.description ILIKE %s)"
+        params.append(f"%{search}%")
+        params.append(f"%{search}%")
+    
+    query += " ORDER BY p.productid"
+    
+    products = execute_query(query, tuple(params) if params else None)
+    return FastJSONResponse({"products": products, "count": len(products)})
+
+@router.post("/api/campaigns/apply", dependencies=STAFF)
+async def apply_campaign(campaign: CampaignCreate, idempotency_key: Optional[str] = Header(None)):
+    async def apply(conn):
+        return await run_in_threadpool(_apply_campaign, campaign, conn)
+    return await run_idempotent("campaigns/apply", idempotency_key, campaign, apply)
+
+def _apply_campaign(campaign: CampaignCreate, conn=None):
+    """Discount the category on conn (left uncommitted, see run_idempotent)
+    or, without one, in a transaction of its own"""
+    own_conn = conn is None
+    with (get_db_connection() if own_conn else nullcontext(conn)) as conn, conn.cursor() as cur:
+        cur.execute("SELECT productid, currentprice FROM product WHERE categoryid = %s AND deletedat IS NULL FOR UPDATE",
+                    (campaign.category_id,))
+        products = cur.fetchall()
+        for prod in products:
+            old_price = float(prod['currentprice'])
+            new_price = old_price * (1 - campaign.discount_percentage / 100)
+
+            cur.execute("UPDATE product SET currentprice = %s WHERE productid = %s", (new_price, prod['productid']))
+
+            cur.execute("""
+                INSERT INTO pricehistory (productid, oldprice, newprice, reason, changedate)
+                VALUES (%s, %s, %s, 'campaign', NOW())
+            """, (prod['productid'], old_price, new_price))
+        if own_conn:
+            conn.commit()
+
+    if not products:
+        return {"message": "No products found in this category"}
+    return {"message": f"{len(products)} products discounted by {campaign.discount_percentage}%"}
+
+def _products_by_id(product_ids):
+    product_ids = batch_ids(product_ids)
+    return FastJSONResponse(keyed(fetch_products(product_ids), product_ids, "products"))
+
+@router.post("/api/products/batch")
+def get_products_batch(batch: IdBatch):
+    return _products_by_id(batch.ids)
+
+@router.get("/api/products/{product_id}")
+@coalesce(ttl=1.0)
+def get_product(product_id: int):
+    product = fetch_products([product_id]).get(product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+@router.get("/api/products/{product_id}/price")
+def get_product_price(product_id: int, at: Optional[datetime] = None):
+    result = fetch_prices_as_of([product_id], at)
+    if not result:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return result[0]
+
+@router.post("/api/products/prices")
+def get_product_prices(lookup: PriceLookup):
+    prices = fetch_prices_as_of(lookup.product_ids, lookup.at)
+    found = {row["productid"] for row in prices}
+    return FastJSONResponse({
+        "prices": prices,
+        "missing": [pid for pid in lookup.product_ids if pid not in found]
+    })
+
+@router.post("/api/products", dependencies=STAFF)
+def create_product(product: ProductCreate):
+    query = """
+        INSERT INTO product (title, description, baseprice, currentprice, isactive, categoryid, supplierid)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        RETURNING productid
+    """
+    result = execute_query(query, (
+        product.title, product.description, product.base_price,
+        product.current_price, product.is_active, product.category_id, product.supplier_id
+    ))
+    
+    new_product_id = result[0]["productid"]
+    
+    inventory_query = """
+        INSERT INTO inventory (productid, stockquantity, lowstockthreshold, highstockthreshold, lastrestockdate)
+        VALUES (%s, 0, 10, 100, CURRENT_DATE)
+    """
+    execute_query(inventory_query, (new_product_id,), fetch=False)
+    
+    return {"message": "Product and inventory record created", "product_id": new_product_id}
+
+@router.put("/api/products/{product_id}", dependencies=STAFF)
+def update_product(product_id: int, product: ProductUpdate):
+    existing = execute_query("SELECT * FROM product WHERE productid = %s AND deletedat IS NULL", (product_id,))
+    if not existing:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    if product.current_price and product.current_price != existing[0]["currentprice"]:
+        history_query = """
+            INSERT INTO pricehistory (productid, oldprice, newprice, reason)
+            VALUES (%s, %s, %s, %s)
+        """
+        execute_query(history_query, (
+            product_id, existing[0]["currentprice"], product.current_price, "manual_update"
+        ), fetch=False)
+    
+    updates = []
+    params = []
+    if product.title:
+        updates.append("title = %s")
+        params.append(product.title)
+    if product.description:
+        updates.append("description = %s")
+        params.append(product.description)
+    if product.base_price:
+        updates.append("baseprice = %s")
+        params.append(product.base_price)
+    if product.current_price:
+        updates.append("currentprice = %s")
+        params.append(product.current_price)
+    if product.is_active is not None:
+        updates.append("isactive = %s")
+        params.append(product.is_active)
+    
+    if updates:
+        params.append(product_id)
+        query = f"UPDATE product SET {', '.join(updates)} WHERE productid = %s"
+        execute_query(query, tuple(params), fetch=False)
+    
+    return {"message": "Product updated"}
+
+@router.delete("/api/products/{product_id}", dependencies=STAFF)
+def delete_product(product_id: int, hard: bool = False):
+    if not delete_products([product_id], hard):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return {"message": "Product deleted" if hard else "Product archived"}
+
+@router.post("/api/products/bulk-delete", dependencies=STAFF)
+def bulk_delete_products(request: BulkDelete):
+    deleted = set(delete_products(request.ids, request.hard))
+    return {
+        "deleted": sorted(deleted),
+        "missing": [pid for pid in request.ids if pid not in deleted]
+    }
+
+@router.get("/api/categories")
+@coalesce(ttl=1.0)
+def get_categories():
+    query = """
+        SELECT c.*, COUNT(p.productid) as product_count
+        FROM category c
+        LEFT JOIN product p ON c.categoryid = p.categoryid AND p.deletedat IS NULL
+        GROUP BY c.categoryid
+        ORDER BY c.categoryid
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.post("/api/categories", dependencies=ADMIN)
+def create_category(category: CategoryCreate):
+    query = "INSERT INTO category (categoryname, description) VALUES (%s, %s) RETURNING categoryid"
+    result = execute_query(query, (category.category_name, category.description))
+    return {"message": "Category created", "category_id": result[0]["categoryid"]}
@@ -0,0 +1,75 @@
+"""
+Suppliers
+"""
+from fastapi import APIRouter, HTTPException
+from database import execute_query
+from responses import FastJSONResponse
+from coalescing import coalesce
+from schemas import SupplierCreate, SupplierUpdate
+from routers.deps import ADMIN, STAFF
+
+router = APIRouter()
+
+@router.get("/api/suppliers", dependencies=STAFF)
+@coalesce(ttl=1.0)
+def get_suppliers():
+    query = """
+        SELECT s.*, COUNT(p.productid) as product_count
+        FROM supplier s
+        LEFT JOIN product p ON s.supplierid = p.supplierid AND p.deletedat IS NULL
+        GROUP BY s.supplierid
+        ORDER BY s.supplierid
+    """
+    return FastJSONResponse(execute_query(query))
+
+@router.get("/api/suppliers/{supplier_id}", dependencies=STAFF)
+def get_supplier(supplier_id: int):
+    result = execute_query('SELECT * FROM supplier WHERE supplierid = %s', (supplier_id,))
+    if not result:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    return result[0]
+
+@router.post("/api/suppliers", dependencies=ADMIN)
+def create_supplier(supplier: SupplierCreate):
+    query = """
+        INSERT INTO supplier (companyname, contactemail, taxnumber, address)
+        VALUES (%s, %s, %s, %s)
+        RETURNING supplierid
+    """
+    result = execute_query(query, (supplier.company_name, supplier.contact_email, supplier.tax_number, supplier.address))
+    return {"message": "Supplier created", "supplier_id": result[0]["supplierid"]}
+
+@router.put("/api/suppliers/{supplier_id}", dependencies=ADMIN)
+def update_supplier(supplier_id: int, supplier: SupplierUpdate):
+    existing = execute_query('SELECT * FROM supplier WHERE supplierid = %s', (supplier_id,))
+    if not existing:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    
+    updates = []
+    params = []
+    
+    if supplier.company_name:
+        updates.append("companyname = %s")
+        params.append(supplier.company_name)
+    if supplier.contact_email is not None:
+        updates.append("contactemail = %s")
+        params.append(supplier.contact_email)
+    if supplier.tax_number is not None:
+        updates.append("taxnumber = %s")
+        params.append(supplier.tax_number)
+    if supplier.address is not None:
+        updates.append("address = %s")
+        params.append(supplier.address)
+    
+    if updates:
+        params.append(supplier_id)
+        query = f'UPDATE supplier SET {", ".join(updates)} WHERE supplierid = %s'
+        execute_query(query, tuple(params), fetch=False)
+    
+    return {"message": "Supplier updated"}
+
+@router.delete("/api/suppliers/{supplier_id}", dependencies=ADMIN)
+def delete_supplier(supplier_id: int):
+    execute_query('UPDATE product SET supplierid = NULL WHERE supplierid = %s', (supplier_id,), fetch=False)
+    execute_query('DELETE FROM supplier WHERE supplierid = %s', (supplier_id,), fetch=False)
+    return {"message": "Supplier deleted"}
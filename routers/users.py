@@ -0,0 +1,155 @@
+"""
+Users, login and bulk import
+"""
+import tempfile
+from datetime import datetime
+from typing import Optional
+import psycopg2
+from fastapi import APIRouter, HTTPException, Request, Depends
+from starlette.concurrency import run_in_threadpool
+from database import execute_query
+from responses import FastJSONResponse
+from repositories import delete_users
+from users import duplicate_field, import_users
+from auth import (hash_password_sync, verify_password_sync, needs_rehash, issue_token, revoke_tokens, forget_tokens,
+                  current_user, optional_user)
+from schemas import UserCreate, UserUpdate, UserLogin, BulkDelete
+from routers.deps import ADMIN
+
+router = APIRouter()
+
+
+def duplicate_error(e: psycopg2.errors.UniqueViolation) -> HTTPException:
+    field, message = duplicate_field(e)
+    return HTTPException(status_code=409, detail={"field": field, "message": message})
+
+@router.get("/api/users", dependencies=ADMIN)
+def get_users():
+    return FastJSONResponse(execute_query('SELECT userid, fullname, email, role, phonenumber FROM "User" WHERE deletedat IS NULL ORDER BY userid'))
+
+@router.get("/api/users/{user_id}", dependencies=ADMIN)
+def get_user(user_id: int):
+    result = execute_query('SELECT * FROM "User" WHERE userid = %s AND deletedat IS NULL', (user_id,))
+    if not result:
+        raise HTTPException(status_code=404, detail="User not found")
+    return result[0]
+
+@router.post("/api/users")
+def create_user(user: UserCreate, claims: Optional[dict] = Depends(optional_user)):
+    if user.role != "customer" and (claims is None or claims["role"] != "admin"):
+        raise HTTPException(status_code=403, detail="Only admins can create seller or admin accounts")
+    password_hash = hash_password_sync(user.password)
+    
+    # A taken email returns no row; a taken phone number raises
+    query = """
+        INSERT INTO "User" (fullname, email, passwordhash, role, phonenumber)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (email) DO NOTHING
+        RETURNING userid
+    """
+    try:
+        result = execute_query(query, (user.full_name, user.email, password_hash, user.role, user.phone_number))
+    except psycopg2.errors.UniqueViolation as e:
+        raise duplicate_error(e)
+    if not result:
+        raise HTTPException(status_code=409, detail={"field": "email", "message": "This email address is already registered"})
+    return {"message": "User created", "user_id": result[0]["userid"]}
+
+@router.post("/api/users/import", dependencies=ADMIN)
+async def import_users_csv(request: Request):
+    """Bulk create/update customers from a CSV body
+    (full_name,email[,phone_number][,password_hash] header first)"""
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            return await run_in_threadpool(import_users, body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except psycopg2.DataError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {e.diag.message_primary}")
+
+@router.post("/api/login")
+def login(credentials: UserLogin):
+    query = 'SELECT userid, fullname, email, role, passwordhash FROM "User" WHERE email = %s AND deletedat IS NULL'
+    result = execute_query(query, (credentials.email,))
+    
+    if not result or not verify_password_sync(credentials.password, result[0]["passwordhash"]):
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    
+    user = dict(result[0])
+    stored_hash = user.pop("passwordhash")
+    if needs_rehash(stored_hash):
+        execute_query('UPDATE "User" SET passwordhash = %s WHERE userid = %s',
+                      (hash_password_sync(credentials.password), user["userid"]), fetch=False)
+    
+    access_token, expires_at = issue_token(user)
+    return {
+        "message": "Login successful",
+        "user": user,
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_at": datetime.fromtimestamp(expires_at)
+    }
+
+@router.post("/api/logout")
+def logout(claims: dict = Depends(current_user)):
+    # Revokes every token of the user, on all devices
+    revoke_tokens(claims["sub"])
+    return {"message": "Logged out"}
+
+@router.put("/api/users/{user_id}", dependencies=ADMIN)
+def update_user(user_id: int, user: UserUpdate):
+    updates = []
+    params = []
+    
+    if user.full_name:
+        updates.append("fullname = %s")
+        params.append(user.full_name)
+    if user.email:
+        updates.append("email = %s")
+        params.append(user.email)
+    if user.password:
+        updates.append("passwordhash = %s")
+        params.append(hash_password_sync(user.password))
+    if user.role:
+        updates.append("role = %s")
+        params.append(user.role)
+    if user.phone_number:
+        updates.append("phonenumber = %s")
+        params.append(user.phone_number)
+    # Tokens carry the role, so a new password or role logs the user out
+    if user.password or user.role:
+        updates.append("tokensvalidafter = NOW()")
+    
+    params.append(user_id)
+    query = f'''
+        UPDATE "User" SET {", ".join(updates) or "userid = userid"}
+        WHERE userid = %s AND deletedat IS NULL
+        RETURNING userid
+    '''
+    try:
+        if not execute_query(query, tuple(params)):
+            raise HTTPException(status_code=404, detail="User not found")
+    except psycopg2.errors.UniqueViolation as e:
+        raise duplicate_error(e)
+    
+    if user.password or user.role:
+        forget_tokens(user_id)
+    
+    return {"message": "User updated"}
+
+@router.delete("/api/users/{user_id}", dependencies=ADMIN)
+def delete_user(user_id: int, hard: bool = False):
+    if not delete_users([user_id], hard):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User deleted" if hard else "User archived"}
+
+@router.post("/api/users/bulk-delete", dependencies=ADMIN)
+def bulk_delete_users(request: BulkDelete):
+    deleted = set(delete_users(request.ids, request.hard))
+    return {
+        "deleted": sorted(deleted),
+        "missing": [uid for uid in request.ids if uid not in deleted]
+    }
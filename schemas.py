@@ -0,0 +1,120 @@
+"""
+Request Models
+Pydantic bodies accepted by the API routers.
+"""
+from datetime import datetime
+from typing import Optional, List
+from pydantic import BaseModel, Field, PositiveInt
+
+# Larger quantities go through sales, not the storefront
+MAX_ITEM_QUANTITY = 1000
+
+class ProductCreate(BaseModel):
+    title: str
+    description: Optional[str] = None
+    base_price: float
+    current_price: float
+    is_active: bool = True
+    category_id: Optional[int] = None
+    supplier_id: Optional[int] = None
+
+
+class ProductUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    base_price: Optional[float] = None
+    current_price: Optional[float] = None
+    is_active: Optional[bool] = None
+    category_id: Optional[int] = None
+    supplier_id: Optional[int] = None
+
+
+class CategoryCreate(BaseModel):
+    category_name: str
+    description: Optional[str] = None
+
+
+class InventoryUpdate(BaseModel):
+    stock_quantity: int
+    low_stock_threshold: Optional[int] = 10
+    high_stock_threshold: Optional[int] = 100
+
+
+class CartItem(BaseModel):
+    product_id: int
+    quantity: PositiveInt = Field(le=MAX_ITEM_QUANTITY)
+
+
+class OrderCreate(BaseModel):
+    user_id: int
+    shipping_address: str
+    items: List[CartItem]
+    quote_token: Optional[str] = None
+
+
+class UserCreate(BaseModel):
+    full_name: str
+    email: str
+    password: str
+    role: str = "customer"
+    phone_number: Optional[str] = None
+
+
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    password: Optional[str] = None
+    role: Optional[str] = None
+    phone_number: Optional[str] = None
+
+
+class UserLogin(BaseModel):
+    email: str
+    password: str
+
+
+class CampaignCreate(BaseModel):
+    category_id: int
+    discount_percentage: float
+
+
+class PriceLookup(BaseModel):
+    product_ids: List[int]
+    at: Optional[datetime] = None
+
+
+class IdBatch(BaseModel):
+    ids: List[int]
+
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+    hard: bool = False
+
+
+class SupplierCreate(BaseModel):
+    company_name: str
+    contact_email: Optional[str] = None
+    tax_number: Optional[str] = None
+    address: Optional[str] = None
+
+
+class SupplierUpdate(BaseModel):
+    company_name: Optional[str] = None
+    contact_email: Optional[str] = None
+    tax_number: Optional[str] = None
+    address: Optional[str] = None
+
+
+class QuoteCreate(BaseModel):
+    user_id: Optional[int] = None
+    items: List[CartItem]
+
+
+class OrderStatusUpdate(BaseModel):
+    order_id: int
+    status: str
+
+
+class OrderStatusBatch(BaseModel):
+    updates: List[OrderStatusUpdate]
@@ -0,0 +1,36 @@
+"""
+Production Server Launcher
+Runs the API in several uvicorn worker processes (one per CPU core by default).
+
+    python server.py
+    WEB_CONCURRENCY=8 PORT=8080 python server.py
+"""
+import os
+import importlib.util
+import uvicorn
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def run():
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        loop="uvloop" if _has_module("uvloop") else "asyncio",
+        http="httptools" if _has_module("httptools") else "h11",
+        backlog=int(os.getenv("BACKLOG", "2048")),
+        # Let in-flight requests finish before a worker exits
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE", "5")),
+        access_log=os.getenv("ACCESS_LOG", "0") == "1",
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+"""
+Signed Tokens
+Compact HMAC-SHA256 signed JSON tokens (payload.signature, base64url),
+shared by the checkout price quotes and the access tokens. Every token
+carries a `typ` claim so one kind can't be replayed as another.
+"""
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+
+
+def load_secret(secret: str, name: str) -> bytes:
+    if not secret:
+        # Tokens then only validate in the worker that issued them
+        print(f"[WARN] {name} is not set; using a random per-process key")
+        secret = secrets.token_hex(32)
+    return secret.encode()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(secret: bytes, body: str) -> str:
+    return _b64encode(hmac.new(secret, body.encode(), hashlib.sha256).digest())
+
+
+def sign(secret: bytes, payload: dict, ttl: int, typ: str) -> tuple:
+    """Add the type and an expiry to payload and return (token, expires_at)"""
+    expires_at = int(time.time()) + ttl
+    claims = {**payload, "typ": typ, "exp": expires_at}
+    body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{body}.{_signature(secret, body)}", expires_at
+
+
+def unsign(secret: bytes, token: str, typ: str):
+    """Payload of a valid, unexpired token of type `typ`, otherwise None"""
+    try:
+        body, signature = token.split(".", 1)
+    except ValueError:
+        return None
+    # Bytes: compare_digest rejects str with non-ASCII characters (TypeError)
+    if not hmac.compare_digest(signature.encode(), _signature(secret, body).encode()):
+        return None
+    try:
+        payload = json.loads(_b64decode(body))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("typ") != typ:
+        return None
+    if payload.get("exp", 0) < time.time():
+        return None
+    return payload
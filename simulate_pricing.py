@@ -0,0 +1,403 @@
+"""
+OFFLINE REPRICING SIMULATOR
+---------------------------
+Replays an order stream against an in-memory snapshot of the catalog and
+compares pricing policies side by side, without touching the live database
+after the snapshot is loaded. Each policy runs in its own process over the
+same stream and the same random draws, so runs are deterministic and the
+differences between policies come from the policies alone.
+
+    python simulate_pricing.py --days 30                       # last 30 days of real orders
+    python simulate_pricing.py --synthetic 2000000 --days 30   # generated orders, real catalog
+    python simulate_pricing.py --synthetic 2000000 --synthetic-products 50000   # no database
+    python simulate_pricing.py --days 30 --policy static --policy trigger \\
+        --policy trigger:up=1.05,down=0.95,cooldown=0.5 --elasticity 1.2
+
+Prices are integer cents; "trigger" is a port of check_low_stock_pricing
+(04_create_triggers.sql), including its NUMERIC(10, 2) rounding.
+"""
+import time
+import heapq
+import argparse
+import multiprocessing
+import numpy as np
+
+DAY = 86400
+
+
+class Snapshot:
+    """Catalog state at the start of the replay plus the order stream.
+
+    Per product (index i, sorted by product id): price/base price in cents,
+    stock, low/high thresholds and the time of the last 'low_stock'/'high_stock'
+    price change. The stream is stored by order: order_time[k] and the lines
+    line_start[k]:line_start[k + 1] of line_product / line_quantity / line_draw.
+    """
+
+    def __init__(self, product_ids, price, base_price, stock, low, high, last_up, last_down,
+                 order_time, line_start, line_product, line_quantity, seed: int = 0):
+        self.product_ids = product_ids
+        self.price = price
+        self.base_price = base_price
+        self.stock = stock
+        self.low = low
+        self.high = high
+        self.last_up = last_up
+        self.last_down = last_down
+        self.order_time = order_time
+        self.line_start = line_start
+        self.line_product = line_product
+        self.line_quantity = line_quantity
+        # Shared uniform draws (common random numbers across policies)
+        self.line_draw = np.random.default_rng(seed).random(len(line_product), dtype=np.float32)
+
+    @property
+    def orders(self) -> int:
+        return len(self.order_time)
+
+
+class PricingPolicy:
+    """Keeps prices unchanged. Subclasses react to every stock change, like
+    the AFTER UPDATE OF StockQuantity trigger does."""
+
+    name = "static"
+
+    def reset(self, snapshot: Snapshot):
+        pass
+
+    def after_stock_change(self, i: int, old: int, new: int, price: int, now: int) -> int:
+        """New price in cents of product i after its stock went old -> new"""
+        return price
+
+
+class TriggerPolicy(PricingPolicy):
+    """check_low_stock_pricing: +10% when a sale takes stock to or below the low
+    threshold, -10% when a restock takes it to or above the high threshold,
+    each at most once per cooldown (a PriceHistory row with the same reason
+    newer than NOW() - cooldown blocks it)."""
+
+    def __init__(self, up: float = 1.10, down: float = 0.90, cooldown: float = 1.0, name: str = "trigger"):
+        self.name = name
+        self.up_bp = round(up * 10000)
+        self.down_bp = round(down * 10000)
+        self.cooldown = cooldown * DAY
+
+    def reset(self, snapshot: Snapshot):
+        self.low = snapshot.low.tolist()
+        self.high = snapshot.high.tolist()
+        self.last_up = snapshot.last_up.tolist()
+        self.last_down = snapshot.last_down.tolist()
+
+    def after_stock_change(self, i, old, new, price, now):
+        if new < old and new <= self.low[i]:
+            if now - self.last_up[i] >= self.cooldown:
+                self.last_up[i] = now
+                # price * 1.10 stored in NUMERIC(10, 2): round half away from zero
+                return (price * self.up_bp + 5000) // 10000
+        elif new > old and new >= self.high[i]:
+            if now - self.last_down[i] >= self.cooldown:
+                self.last_down[i] = now
+                return (price * self.down_bp + 5000) // 10000
+        return price
+
+
+POLICIES = {
+    "static": PricingPolicy,
+    "trigger": TriggerPolicy,
+}
+
+
+def make_policy(spec: str) -> PricingPolicy:
+    """'trigger' or 'trigger:up=1.05,down=0.95,cooldown=0.5'"""
+    name, _, options = spec.partition(":")
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r} (available: {', '.join(POLICIES)})")
+    kwargs = {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        kwargs[key.strip()] = float(value)
+    policy = POLICIES[name](**kwargs)
+    policy.name = spec
+    return policy
+
+
+def replay(snapshot: Snapshot, policy: PricingPolicy, elasticity: float = 0.0,
+           restock_lead_days: float = 0.0) -> dict:
+    """Run the whole stream through one policy and return its metrics.
+
+    Orders are all-or-nothing like POST /api/orders: if any line lacks stock,
+    the order is lost. With elasticity > 0 a customer skips a line when its
+    draw is above (base price / price) ** elasticity. With a restock lead
+    time, a product that falls below its low threshold gets (high - low)
+    units back that many days later.
+    """
+    started = time.perf_counter()
+    policy.reset(snapshot)
+    price = snapshot.price.tolist()
+    base = snapshot.base_price.tolist()
+    stock = snapshot.stock.tolist()
+    low = snapshot.low.tolist()
+    high = snapshot.high.tolist()
+    order_time = snapshot.order_time.tolist()
+    line_start = snapshot.line_start.tolist()
+    line_product = snapshot.line_product.tolist()
+    line_quantity = snapshot.line_quantity.tolist()
+    line_draw = snapshot.line_draw.tolist()
+    start_price = snapshot.price
+
+    restock_lead = restock_lead_days * DAY
+    pending = []
+    restocking = set()
+    after = policy.after_stock_change
+
+    revenue = units = orders = lost_orders = lost_units = declined = 0
+    price_changes = restocks = 0
+    stocked_out = set()
+    changed = set()
+
+    for k, now in enumerate(order_time):
+        while pending and pending[0][0] <= now:
+            _, i = heapq.heappop(pending)
+            restocking.discard(i)
+            old = stock[i]
+            stock[i] = old + high[i] - low[i]
+            restocks += 1
+            new_price = after(i, old, stock[i], price[i], now)
+            if new_price != price[i]:
+                price[i] = new_price
+                price_changes += 1
+                changed.add(i)
+
+        first, last = line_start[k], line_start[k + 1]
+        if elasticity:
+            lines = [j for j in range(first, last)
+                     if line_draw[j] < (base[line_product[j]] / price[line_product[j]]) ** elasticity]
+            declined += last - first - len(lines)
+            if not lines:
+                continue
+        else:
+            lines = range(first, last)
+
+        if any(stock[line_product[j]] < line_quantity[j] for j in lines):
+            lost_orders += 1
+            for j in lines:
+                lost_units += line_quantity[j]
+                if stock[line_product[j]] < line_quantity[j]:
+                    stocked_out.add(line_product[j])
+            continue
+
+        orders += 1
+        for j in lines:
+            i = line_product[j]
+            quantity = line_quantity[j]
+            revenue += price[i] * quantity
+            units += quantity
+            old = stock[i]
+            stock[i] = old - quantity
+            new_price = after(i, old, stock[i], price[i], now)
+            if new_price != price[i]:
+                price[i] = new_price
+                price_changes += 1
+                changed.add(i)
+            if restock_lead and stock[i] < low[i] and i not in restocking:
+                restocking.add(i)
+                heapq.heappush(pending, (now + restock_lead, i))
+
+    seconds = time.perf_counter() - started
+    price_ratio = np.array(price, dtype=np.float64) / np.maximum(start_price, 1)
+    return {
+        "policy": policy.name,
+        "revenue": revenue / 100,
+        "units": units,
+        "orders": orders,
+        "lost_orders": lost_orders,
+        "lost_units": lost_units,
+        "declined_lines": declined,
+        "stocked_out_products": len(stocked_out),
+        "price_changes": price_changes,
+        "repriced_products": len(changed),
+        "avg_price_change_pct": round((float(price_ratio.mean()) - 1) * 100, 2) if len(price) else 0.0,
+        "restocks": restocks,
+        "seconds": round(seconds, 2),
+        "orders_per_minute": round(snapshot.orders / seconds * 60) if seconds else 0,
+    }
+
+
+_snapshot = None
+
+
+def _init_worker(snapshot: Snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _run_policy(args) -> dict:
+    spec, elasticity, restock_lead_days = args
+    return replay(_snapshot, make_policy(spec), elasticity, restock_lead_days)
+
+
+def compare_policies(snapshot: Snapshot, specs: list, elasticity: float = 0.0,
+                     restock_lead_days: float = 0.0, workers: int = None) -> list:
+    """Replay the stream once per policy, in parallel processes"""
+    for spec in specs:
+        make_policy(spec)  # fail fast on a bad spec
+    jobs = [(spec, elasticity, restock_lead_days) for spec in specs]
+    workers = min(len(jobs), workers or multiprocessing.cpu_count())
+    if workers <= 1:
+        _init_worker(snapshot)
+        return [_run_policy(job) for job in jobs]
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(snapshot,)) as pool:
+        return pool.map(_run_policy, jobs)
+
+
+def _order_stream(order_ids: np.ndarray, order_time: np.ndarray, line_product: np.ndarray,
+                  line_quantity: np.ndarray) -> tuple:
+    """Compact line arrays (sorted by time, then order) into per-order offsets"""
+    first = np.flatnonzero(np.diff(order_ids, prepend=-1)) if len(order_ids) else np.empty(0, dtype=np.int64)
+    line_start = np.append(first, len(order_ids)).astype(np.int64)
+    return order_time[first].astype(np.int64), line_start, line_product.astype(np.int32), line_quantity.astype(np.int32)
+
+
+def load_snapshot(days: float, synthetic_orders: int = 0, seed: int = 0) -> Snapshot:
+    """Catalog as of `days` ago plus the orders since then (or a synthetic
+    stream over the same window)."""
+    from forecast import copy_array
+    from repositories import PRICE_AS_OF_QUERY
+    from database import get_db_connection
+
+    with get_db_connection() as conn, conn.cursor() as cur:
+        # Timestamps are local (TIMESTAMP columns); epochs are taken the same way
+        cur.execute("""
+            SELECT start_at, EXTRACT(EPOCH FROM start_at)::bigint AS start
+            FROM (SELECT LOCALTIMESTAMP - %s * INTERVAL '1 day' AS start_at) s
+        """, (days,))
+        row = cur.fetchone()
+        start_at, start = row["start_at"], row["start"]
+        products = copy_array(cur, """
+            SELECT p.productid, ROUND(p.baseprice * 100)::bigint, i.stockquantity,
+                   i.lowstockthreshold, i.highstockthreshold
+            FROM product p
+            JOIN inventory i ON i.productid = p.productid
+            WHERE p.deletedat IS NULL
+            ORDER BY p.productid
+        """, (), 5)
+        product_ids = products[:, 0]
+
+        as_of = cur.mogrify(PRICE_AS_OF_QUERY, {"ids": product_ids.tolist(), "at": start_at}).decode()
+        prices = copy_array(cur, f"SELECT productid, ROUND(price * 100)::bigint FROM ({as_of}) q ORDER BY productid", (), 2)
+
+        history = copy_array(cur, """
+            SELECT productid, (reason = 'high_stock')::int, EXTRACT(EPOCH FROM MAX(changedate))::bigint
+            FROM pricehistory
+            WHERE reason IN ('low_stock', 'high_stock') AND changedate <= %s
+            GROUP BY productid, reason
+        """, (start_at,), 3)
+
+        stream = None
+        if not synthetic_orders:
+            stream = copy_array(cur, """
+                SELECT o.orderid, EXTRACT(EPOCH FROM o.orderdate)::bigint, oi.productid, SUM(oi.quantity)
+                FROM orderitem oi
+                JOIN "Order" o ON o.orderid = oi.orderid
+                WHERE o.orderdate >= %s AND o.status <> 'cancelled'
+                GROUP BY o.orderid, o.orderdate, oi.productid
+                ORDER BY 2, 1
+            """, (start_at,), 4)
+        conn.commit()
+
+    n = len(product_ids)
+    price = np.empty(n, dtype=np.int64)
+    price[np.searchsorted(product_ids, prices[:, 0])] = prices[:, 1]
+    never = np.full(n, -(10 ** 12), dtype=np.int64)
+    last_up, last_down = never.copy(), never.copy()
+    if len(history):
+        index = np.searchsorted(product_ids, history[:, 0])
+        known = (index < n) & (product_ids[np.minimum(index, n - 1)] == history[:, 0])
+        up = known & (history[:, 1] == 0)
+        down = known & (history[:, 1] == 1)
+        last_up[index[up]] = history[up, 2]
+        last_down[index[down]] = history[down, 2]
+
+    stock = products[:, 2].copy()
+    if stream is None:
+        order_time, line_start, line_product, line_quantity = synthetic_stream(
+            n, synthetic_orders, start, days, seed)
+    else:
+        index = np.searchsorted(product_ids, stream[:, 2])
+        known = (index < n) & (product_ids[np.minimum(index, n - 1)] == stream[:, 2])
+        stream, index = stream[known], index[known]
+        order_time, line_start, line_product, line_quantity = _order_stream(
+            stream[:, 0], stream[:, 1], index, stream[:, 3])
+        # Without restock history, start from today's stock plus everything sold since
+        np.add.at(stock, line_product, line_quantity)
+
+    return Snapshot(product_ids, price, products[:, 1], stock, products[:, 3], products[:, 4],
+                    last_up, last_down, order_time, line_start, line_product, line_quantity, seed)
+
+
+def synthetic_stream(products: int, orders: int, start: int, days: float, seed: int = 0) -> tuple:
+    """Orders spread uniformly over the window with 1-3 lines of 1-5 units,
+    product popularity following a Zipf-like curve"""
+    rng = np.random.default_rng(seed)
+    order_time = np.sort(rng.integers(start, start + int(days * DAY), orders))
+    lines_per_order = rng.integers(1, 4, orders)
+    line_start = np.concatenate([[0], np.cumsum(lines_per_order)]).astype(np.int64)
+    weights = 1.0 / np.arange(1, products + 1) ** 0.8
+    popularity = rng.permutation(products)
+    rank = np.searchsorted(np.cumsum(weights) / weights.sum(), rng.random(line_start[-1]))
+    line_product = popularity[np.minimum(rank, products - 1)].astype(np.int32)
+    line_quantity = rng.integers(1, 6, line_start[-1]).astype(np.int32)
+    return order_time, line_start, line_product, line_quantity
+
+
+def synthetic_snapshot(products: int, orders: int, days: float, seed: int = 0) -> Snapshot:
+    """Catalog and stream without a database, for benchmarking policies"""
+    rng = np.random.default_rng(seed + 1)
+    base_price = rng.integers(500, 500000, products)
+    low = rng.integers(5, 20, products)
+    high = low + rng.integers(50, 200, products)
+    stock = rng.integers(low, high)
+    never = np.full(products, -(10 ** 12), dtype=np.int64)
+    order_time, line_start, line_product, line_quantity = synthetic_stream(products, orders, 0, days, seed)
+    return Snapshot(np.arange(1, products + 1), base_price.copy(), base_price, stock, low, high,
+                    never, never.copy(), order_time, line_start, line_product, line_quantity, seed)
+
+
+def print_report(results: list):
+    columns = ["policy", "revenue", "orders", "lost_orders", "lost_units", "declined_lines",
+               "stocked_out_products", "price_changes", "repriced_products",
+               "avg_price_change_pct", "restocks", "seconds", "orders_per_minute"]
+    widths = [max(len(c), *(len(f"{r[c]:,}" if not isinstance(r[c], str) else r[c]) for r in results))
+              for c in columns]
+    print("  ".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join((f"{r[c]:,}" if not isinstance(r[c], str) else r[c]).rjust(w)
+                        for c, w in zip(columns, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay orders offline through pricing policies")
+    parser.add_argument("--days", type=float, default=30, help="replay window ending now")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N orders instead of replaying history")
+    parser.add_argument("--synthetic-products", type=int, default=0,
+                        help="also generate a catalog of N products (no database needed)")
+    parser.add_argument("--policy", action="append", help="policy spec, repeatable (default: static, trigger)")
+    parser.add_argument("--elasticity", type=float, default=0.0, help="price elasticity of demand (0 = replay as is)")
+    parser.add_argument("--restock-lead-days", type=float, default=0.0, help="refill low products after N days (0 = off)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        loading = time.perf_counter()
+        if args.synthetic_products:
+            snapshot = synthetic_snapshot(args.synthetic_products, args.synthetic or 1_000_000, args.days, args.seed)
+        else:
+            snapshot = load_snapshot(args.days, args.synthetic, args.seed)
+        print(f"[INFO] {snapshot.orders:,} orders, {len(snapshot.line_product):,} lines, "
+              f"{len(snapshot.product_ids):,} products loaded in {time.perf_counter() - loading:.1f}s")
+        results = compare_policies(snapshot, args.policy or ["static", "trigger"],
+                                   args.elasticity, args.restock_lead_days, args.workers)
+        print_report(results)
+    except Exception as e:
+        print(f"[ERROR] Simulation failed: {e}")
@@ -38,9 +38,30 @@ function getPageTitle(pageName) {
     return titles[pageName] || pageName;
 }
 
+function errorMessage(result) {
+    if (result.detail && result.detail.message) return result.detail.message;
+    return typeof result.detail === 'string' ? result.detail : JSON.stringify(result);
+}
+
+// The admin panel reuses the session the store login saved
+function authHeaders(headers = {}) {
+    const savedUser = JSON.parse(localStorage.getItem('currentUser') || 'null');
+    if (savedUser && savedUser.access_token) {
+        headers['Authorization'] = `Bearer ${savedUser.access_token}`;
+    }
+    return headers;
+}
+
+function redirectIfUnauthorized(response) {
+    if (response.status === 401 || response.status === 403) {
+        window.location.href = '/store';
+    }
+}
+
 async function fetchAPI(endpoint) {
     try {
-        const response = await fetch(`${API_BASE}${endpoint}`);
+        const response = await fetch(`${API_BASE}${endpoint}`, { headers: authHeaders() });
+        redirectIfUnauthorized(response);
         if (!response.ok) throw new Error('API Error');
         return await response.json();
     } catch (error) {
@@ -54,13 +75,14 @@ async function postAPI(endpoint, data) {
         console.log('POST Request:', endpoint, data);
         const response = await fetch(`${API_BASE}${endpoint}`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify(data)
         });
+        redirectIfUnauthorized(response);
         const result = await response.json();
         console.log('POST Response:', result);
         if (!response.ok) {
-            alert('Error: ' + (result.detail || JSON.stringify(result)));
+            alert('Error: ' + errorMessage(result));
             return null;
         }
         return result;
@@ -76,12 +98,13 @@ async function putAPI(endpoint, data) {
         console.log('PUT Request:', endpoint, data);
         const response = await fetch(`${API_BASE}${endpoint}`, {
             method: 'PUT',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify(data)
         });
+        redirectIfUnauthorized(response);
         const result = await response.json();
         if (!response.ok) {
-            alert('Error: ' + (result.detail || JSON.stringify(result)));
+            alert('Error: ' + errorMessage(result));
             return null;
         }
         return result;
@@ -94,10 +117,11 @@ async function putAPI(endpoint, data) {
 
 async function deleteAPI(endpoint) {
     try {
-        const response = await fetch(`${API_BASE}${endpoint}`, { method: 'DELETE' });
+        const response = await fetch(`${API_BASE}${endpoint}`, { method: 'DELETE', headers: authHeaders() });
+        redirectIfUnauthorized(response);
         const result = await response.json();
         if (!response.ok) {
-            alert('Error: ' + (result.detail || JSON.stringify(result)));
+            alert('Error: ' + errorMessage(result));
             return null;
         }
         return result;
@@ -2,15 +2,18 @@ const API_BASE = '/api';
 
 let cart = [];
 let currentUser = null;
+let cartQuote = null;
+let checkoutKey = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     checkAuth();
 });
 
 function checkAuth() {
-    const savedUser = localStorage.getItem('currentUser');
-    if (savedUser) {
-        currentUser = JSON.parse(savedUser);
+    const savedUser = JSON.parse(localStorage.getItem('currentUser') || 'null');
+    // Sessions saved before tokens existed have to sign in again
+    if (savedUser && savedUser.access_token) {
+        currentUser = savedUser;
         onLoginSuccess();
     } else {
         showAuthOverlay();
@@ -54,7 +57,7 @@ async function handleLogin(event) {
         const result = await response.json();
 
         if (response.ok) {
-            currentUser = result.user;
+            currentUser = { ...result.user, access_token: result.access_token };
             localStorage.setItem('currentUser', JSON.stringify(currentUser));
             onLoginSuccess();
         } else {
@@ -102,7 +105,7 @@ async function handleRegister(event) {
             showLogin();
             document.getElementById('login-email').value = email;
         } else {
-            errorDiv.textContent = result.detail || 'Registration failed';
+            errorDiv.textContent = (result.detail && result.detail.message) || result.detail || 'Registration failed';
             errorDiv.style.display = 'block';
         }
     } catch (error) {
@@ -135,6 +138,12 @@ function onLoginSuccess() {
 }
 
 function logout() {
+    if (currentUser && currentUser.access_token) {
+        fetch(`${API_BASE}/logout`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${currentUser.access_token}` }
+        });
+    }
     currentUser = null;
     localStorage.removeItem('currentUser');
     cart = [];
@@ -251,6 +260,32 @@ function updateCartUI() {
 
     const total = cart.reduce((sum, item) => sum + (item.price * item.qty), 0);
     totalEl.textContent = `₺${total.toLocaleString()}`;
+
+    refreshQuote();
+}
+
+async function refreshQuote() {
+    cartQuote = null;
+    checkoutKey = null;
+    if (cart.length === 0) return;
+
+    const items = cart.map(item => ({ product_id: item.id, quantity: item.qty }));
+    try {
+        const response = await fetch(`${API_BASE}/quotes`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ user_id: currentUser ? currentUser.userid : null, items })
+        });
+        if (!response.ok) return;
+
+        const quote = await response.json();
+        // Ignore the answer if the cart changed while it was in flight
+        if (JSON.stringify(items) !== JSON.stringify(cart.map(item => ({ product_id: item.id, quantity: item.qty })))) return;
+        cartQuote = quote;
+        document.getElementById('cart-total').textContent = `₺${Number(quote.total).toLocaleString()}`;
+    } catch (error) {
+        console.error('Error fetching quote:', error);
+    }
 }
 
 async function checkout() {
@@ -277,13 +312,21 @@ async function checkout() {
         items: cart.map(item => ({
             product_id: item.id,
             quantity: item.qty
-        }))
+        })),
+        quote_token: cartQuote ? cartQuote.token : null
     };
 
+    // Re-submitting the same cart (e.g. after a timeout) must not create a second order
+    if (!checkoutKey) checkoutKey = crypto.randomUUID();
+
     try {
         const response = await fetch(`${API_BASE}/orders`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': checkoutKey,
+                'Authorization': `Bearer ${currentUser.access_token}`
+            },
             body: JSON.stringify(orderData)
         });
 
@@ -295,7 +338,11 @@ async function checkout() {
             updateCartUI();
             toggleCart();
             document.getElementById('shipping-address').value = '';
+        } else if (response.status === 401) {
+            alert('Your session has expired, please sign in again.');
+            logout();
         } else {
+            checkoutKey = null;
             alert('Error: ' + result.detail);
         }
     } catch (error) {
@@ -0,0 +1,75 @@
+"""
+Static Asset Cache
+Loads the frontend files into memory once per worker, with precompressed
+gzip/brotli variants and ETags, so requests never touch the filesystem.
+"""
+import os
+import gzip
+import hashlib
+import mimetypes
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 512
+
+
+class StaticAsset:
+    __slots__ = ("body", "gzip", "br", "etag", "media_type", "cache_control")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        self.gzip = None
+        self.br = None
+        if len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            self.gzip = gzip.compress(body, compresslevel=9)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=11)
+
+
+def load_assets(directory: str = "static") -> dict:
+    """Read every file under directory into a {relative_path: StaticAsset} map"""
+    assets = {}
+    if not os.path.isdir(directory):
+        return assets
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".backup"):
+                continue
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, directory).replace(os.sep, "/")
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            # HTML pages are revalidated on every load; css/js are cached for an hour
+            cache_control = "no-cache" if media_type == "text/html" else "public, max-age=3600"
+            with open(path, "rb") as f:
+                assets[rel_path] = StaticAsset(f.read(), media_type, cache_control)
+    return assets
+
+
+def asset_response(asset: StaticAsset, request: Request) -> Response:
+    """Serve an asset, honouring If-None-Match and Accept-Encoding"""
+    headers = {
+        "ETag": asset.etag,
+        "Cache-Control": asset.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+
+    accept_encoding = request.headers.get("accept-encoding", "")
+    body = asset.body
+    if asset.br is not None and "br" in accept_encoding:
+        body = asset.br
+        headers["Content-Encoding"] = "br"
+    elif asset.gzip is not None and "gzip" in accept_encoding:
+        body = asset.gzip
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,139 @@
+"""
+Stock Event Feed
+Reads the StockEvent table filled by the trg_stock_events trigger and waits
+for new events with LISTEN/NOTIFY (long polling), so consumers learn about
+threshold crossings within milliseconds without scanning Inventory.
+Each worker keeps one LISTEN connection, watched by the event loop, and wakes
+every waiting request on a notification; waiting holds no connection or thread.
+"""
+import asyncio
+import psycopg2
+from starlette.concurrency import run_in_threadpool
+from database import get_router, execute_query, bind_request, unbind_request
+
+CHANNEL = "stock_events"
+
+# Events come in (TxID, EventID) order and only from transactions older than
+# every one still running, so no event can commit behind the cursor. The cursor
+# is the EventID of the last event received; its TxID is looked up here.
+EVENTS_QUERY = """
+    WITH cursor AS (
+        SELECT COALESCE(
+            (SELECT txid FROM stockevent WHERE eventid <= %(since)s ORDER BY eventid DESC LIMIT 1),
+            '0'::xid8
+        ) AS txid
+    )
+    SELECT e.eventid, e.productid, p.title, e.eventtype, e.stockquantity,
+           e.lowstockthreshold, e.highstockthreshold, e.createdat
+    FROM stockevent e
+    CROSS JOIN cursor c
+    INNER JOIN product p ON e.productid = p.productid
+    WHERE (e.txid, e.eventid) > (c.txid, %(since)s)
+      AND e.txid < pg_snapshot_xmin(pg_current_snapshot())
+    ORDER BY e.txid, e.eventid
+    LIMIT %(limit)s
+"""
+
+
+class StockEventListener:
+    """The worker's LISTEN connection and the requests waiting for a NOTIFY"""
+
+    def __init__(self):
+        self.conn = None
+        self._fd = None
+        self._loop = None
+        self._waiters = set()
+
+    def subscribe(self) -> asyncio.Future:
+        """Future resolved by the next notification (or a lost connection)"""
+        if self.conn is None:
+            self._connect()
+        fut = self._loop.create_future()
+        self._waiters.add(fut)
+        return fut
+
+    def unsubscribe(self, fut: asyncio.Future):
+        self._waiters.discard(fut)
+
+    def _connect(self):
+        # A dedicated connection, not a pooled one: it stays in LISTEN for the
+        # worker's lifetime
+        conn = get_router().primary.connect()
+        conn.autocommit = True
+        cur = conn.cursor()
+        try:
+            cur.execute(f"LISTEN {CHANNEL}")
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            cur.close()
+        self._loop = asyncio.get_running_loop()
+        self._fd = conn.fileno()
+        self._loop.add_reader(self._fd, self._on_readable)
+        self.conn = conn
+
+    def _on_readable(self):
+        try:
+            self.conn.poll()
+        except psycopg2.Error as e:
+            # Reconnects on the next subscribe(); waiters re-read and return
+            print(f"[WARN] Stock event listener lost its connection: {e}")
+            self.close()
+            return
+        if self.conn.notifies:
+            self.conn.notifies.clear()
+            self._wake()
+
+    def _wake(self):
+        waiters, self._waiters = self._waiters, set()
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(True)
+
+    def close(self):
+        if self.conn is not None:
+            self._loop.remove_reader(self._fd)
+            self.conn.close()
+            self.conn = None
+        self._wake()
+
+
+listener = StockEventListener()
+
+
+def read_events(since: int, limit: int) -> list:
+    # From the primary: a replica may not have replayed the notified event yet
+    tokens = bind_request(False)
+    try:
+        return execute_query(EVENTS_QUERY, {"since": since, "limit": limit})
+    finally:
+        unbind_request(tokens)
+
+
+async def fetch_events(since: int, limit: int, wait: float = 0) -> list:
+    """Events after the `since` cursor; if there are none, wait up to `wait`
+    seconds for one.
+
+    The request subscribes before each read so an event committed between the
+    read and the wait still wakes it up. A notified event can still be held
+    back while an older transaction is running, so the wait then continues.
+    """
+    if wait <= 0:
+        return await run_in_threadpool(read_events, since, limit)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        fut = listener.subscribe()
+        try:
+            events = await run_in_threadpool(read_events, since, limit)
+            remaining = deadline - loop.time()
+            if events or remaining <= 0:
+                return events
+            try:
+                await asyncio.wait_for(fut, remaining)
+            except asyncio.TimeoutError:
+                return []
+        finally:
+            listener.unsubscribe(fut)
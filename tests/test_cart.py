@@ -0,0 +1,38 @@
+"""Cart item validation and pricing"""
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+import routers.orders
+from routers.orders import price_cart
+from schemas import OrderCreate, QuoteCreate, MAX_ITEM_QUANTITY
+
+
+@pytest.mark.parametrize("item", [
+    {"product_id": 1, "quantity": 0},
+    {"product_id": 1, "quantity": -3},
+    {"product_id": 1, "quantity": MAX_ITEM_QUANTITY + 1},
+    {"product_id": 1, "quantity": "many"},
+    {"product_id": "abc", "quantity": 1},
+    {"product_id": 1},
+])
+def test_invalid_items_are_rejected(item):
+    with pytest.raises(ValidationError):
+        QuoteCreate(items=[item])
+    with pytest.raises(ValidationError):
+        OrderCreate(user_id=1, shipping_address="x", items=[item])
+
+
+def test_duplicate_lines_are_checked_against_stock_together(monkeypatch):
+    monkeypatch.setattr(routers.orders, "execute_query", lambda query, params=None, fetch=True: [
+        {"productid": 1, "currentprice": Decimal("2.50"), "stockquantity": 5},
+    ])
+    items = QuoteCreate(items=[{"product_id": 1, "quantity": 2}, {"product_id": 1, "quantity": 3}]).items
+    valid_items, total = price_cart(items)
+    assert total == Decimal("12.50")
+    assert [item["quantity"] for item in valid_items] == [2, 3]
+
+    items = QuoteCreate(items=[{"product_id": 1, "quantity": 3}, {"product_id": 1, "quantity": 3}]).items
+    with pytest.raises(HTTPException) as exc:
+        price_cart(items)
+    assert exc.value.status_code == 400
@@ -0,0 +1,122 @@
+"""@coalesce single-flight, micro-cache and cancellation"""
+import asyncio
+import pytest
+import coalescing
+from coalescing import coalesce, coalesce_scope
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    coalescing._cache.clear()
+    coalescing._in_flight.clear()
+    yield
+    coalescing._cache.clear()
+
+
+def slow_handler(runs: list, delay: float = 0.05, ttl: float = 1.0):
+    @coalesce(ttl=ttl)
+    async def handler(item_id: int = 1):
+        runs.append(item_id)
+        await asyncio.sleep(delay)
+        return {"item_id": item_id, "run": len(runs)}
+    return handler
+
+
+def test_concurrent_identical_requests_share_one_run():
+    runs = []
+    handler = slow_handler(runs)
+
+    async def main():
+        responses = await asyncio.gather(*[handler(item_id=1) for _ in range(5)])
+        assert len({r.body for r in responses}) == 1
+        other = await handler(item_id=2)
+        assert other.body == b'{"item_id":2,"run":2}'
+
+    asyncio.run(main())
+    assert runs == [1, 2]
+
+
+def test_micro_cache_serves_until_ttl_then_reruns():
+    runs = []
+    handler = slow_handler(runs, delay=0, ttl=0.05)
+
+    async def main():
+        await handler(item_id=1)
+        await handler(item_id=1)
+        assert runs == [1]
+        await asyncio.sleep(0.06)
+        await handler(item_id=1)
+        assert runs == [1, 1]
+
+    asyncio.run(main())
+
+
+def test_leader_disconnect_does_not_cancel_followers():
+    runs = []
+    handler = slow_handler(runs)
+
+    async def main():
+        leader = asyncio.create_task(handler(item_id=1))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(handler(item_id=1))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        response = await follower
+        assert leader.cancelled()
+        assert response.status_code == 200
+        assert response.body == b'{"item_id":1,"run":1}'
+        assert coalescing._in_flight == {}
+
+    asyncio.run(main())
+    assert runs == [1]
+
+
+def test_run_finishes_and_caches_after_everyone_left():
+    runs = []
+    handler = slow_handler(runs)
+
+    async def main():
+        only = asyncio.create_task(handler(item_id=1))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        await asyncio.sleep(0.06)
+        await handler(item_id=1)
+
+    asyncio.run(main())
+    assert runs == [1]
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    runs = []
+
+    @coalesce(ttl=1.0)
+    async def failing(item_id: int = 1):
+        runs.append(item_id)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("query failed")
+
+    async def main():
+        results = await asyncio.gather(failing(item_id=1), failing(item_id=1), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await failing(item_id=1)
+
+    asyncio.run(main())
+    assert runs == [1, 1]
+
+
+def test_scope_is_part_of_the_key():
+    runs = []
+    handler = slow_handler(runs, delay=0)
+
+    async def main():
+        token = coalesce_scope.set('W/"category.1"')
+        await handler(item_id=1)
+        coalesce_scope.reset(token)
+        token = coalesce_scope.set('W/"category.2"')
+        await handler(item_id=1)
+        coalesce_scope.reset(token)
+
+    asyncio.run(main())
+    assert runs == [1, 1]
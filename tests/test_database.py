@@ -0,0 +1,50 @@
+"""Pooled primary connections from get_db_connection"""
+import pytest
+import database
+from database import DatabaseRouter, get_db_connection
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self):
+        self.idle = [FakeConnection()]
+        self.returned = []
+
+    def getconn(self):
+        return self.idle.pop()
+
+    def putconn(self, conn, close=False):
+        self.returned.append(conn)
+        self.idle.append(conn)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    router = DatabaseRouter()
+    router.primary.pool = FakePool()
+    monkeypatch.setattr(database, "_router", router)
+    return router.primary.pool
+
+
+def test_connection_comes_from_the_pool_and_goes_back(pool):
+    with get_db_connection() as conn:
+        assert pool.idle == []
+    assert pool.returned == [conn]
+    assert conn.rollbacks == 0
+
+
+def test_error_rolls_back_and_still_releases(pool):
+    with pytest.raises(RuntimeError):
+        with get_db_connection() as conn:
+            raise RuntimeError("insert failed")
+    assert conn.rollbacks == 1
+    assert pool.returned == [conn]
@@ -0,0 +1,141 @@
+"""run_idempotent claim / replay / completion, with the database calls faked"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+import idempotency
+
+
+class Payload(BaseModel):
+    value: int
+
+
+class FakeStore:
+    """Stands in for the IdempotencyKey table and the claiming connection"""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    def claim(self, endpoint, key, request_hash):
+        row = self.rows.get((endpoint, key))
+        if row is None:
+            self.rows[(endpoint, key)] = {"hash": request_hash, "response": None}
+            conn = object()
+            self.calls.append(("claim", conn))
+            return conn, None
+        if row["hash"] != request_hash:
+            raise HTTPException(status_code=422, detail="different request")
+        return None, row["response"]
+
+    def complete(self, conn, endpoint, key, status_code, body, discard_writes=False):
+        self.calls.append(("complete", conn, status_code, discard_writes))
+        self.rows[(endpoint, key)]["response"] = (status_code, body)
+
+    def abort(self, conn):
+        self.calls.append(("abort", conn))
+        self.rows = {k: v for k, v in self.rows.items() if v["response"] is not None}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeStore()
+    monkeypatch.setattr(idempotency, "_claim", store.claim)
+    monkeypatch.setattr(idempotency, "_complete", store.complete)
+    monkeypatch.setattr(idempotency, "_abort", store.abort)
+    return store
+
+
+def test_without_key_the_handler_gets_no_connection(store):
+    seen = []
+
+    async def handler(conn):
+        seen.append(conn)
+        return {"ok": True}
+
+    assert asyncio.run(idempotency.run_idempotent("orders", None, Payload(value=1), handler)) == {"ok": True}
+    assert seen == [None]
+    assert store.calls == []
+
+
+def test_handler_writes_on_the_claiming_connection_and_retry_replays(store):
+    runs = []
+
+    async def handler(conn):
+        runs.append(conn)
+        return {"order_id": 7}
+
+    first = asyncio.run(idempotency.run_idempotent("orders", "k1", Payload(value=1), handler))
+    retry = asyncio.run(idempotency.run_idempotent("orders", "k1", Payload(value=1), handler))
+
+    claimed = store.calls[0][1]
+    assert first == {"order_id": 7}
+    assert runs == [claimed]
+    assert store.calls[1] == ("complete", claimed, 200, False)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.body == b'{"order_id":7}'
+
+
+def test_client_error_is_stored_without_the_handlers_writes(store):
+    async def handler(conn):
+        raise HTTPException(status_code=400, detail="Insufficient stock")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(idempotency.run_idempotent("orders", "k2", Payload(value=1), handler))
+    assert store.calls[-1][2:] == (400, True)
+
+    retry = asyncio.run(idempotency.run_idempotent("orders", "k2", Payload(value=1), handler))
+    assert retry.status_code == 400
+
+
+def test_server_error_releases_the_key(store):
+    attempts = []
+
+    async def handler(conn):
+        attempts.append(conn)
+        if len(attempts) == 1:
+            raise RuntimeError("database went away")
+        return {"order_id": 8}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(idempotency.run_idempotent("orders", "k3", Payload(value=1), handler))
+    assert store.calls[-1][0] == "abort"
+    assert asyncio.run(idempotency.run_idempotent("orders", "k3", Payload(value=1), handler)) == {"order_id": 8}
+
+
+def test_reused_key_with_a_different_request_is_rejected(store):
+    async def handler(conn):
+        return {}
+
+    asyncio.run(idempotency.run_idempotent("orders", "k4", Payload(value=1), handler))
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(idempotency.run_idempotent("orders", "k4", Payload(value=2), handler))
+    assert e.value.status_code == 422
+
+
+def test_local_lock_is_kept_while_duplicates_wait(store):
+    async def main():
+        release = asyncio.Event()
+        runs = []
+
+        async def handler(conn):
+            runs.append(conn)
+            await release.wait()
+            return {"order_id": 9}
+
+        first = asyncio.create_task(idempotency.run_idempotent("orders", "k5", Payload(value=1), handler))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(idempotency.run_idempotent("orders", "k5", Payload(value=1), handler))
+        third = asyncio.create_task(idempotency.run_idempotent("orders", "k5", Payload(value=1), handler))
+        await asyncio.sleep(0.01)
+        assert idempotency._local_locks[("orders", "k5")][1] == 3
+
+        release.set()
+        results = await asyncio.gather(first, second, third)
+        assert len(runs) == 1
+        assert results[0] == {"order_id": 9}
+        assert all(r.headers["Idempotent-Replayed"] == "true" for r in results[1:])
+        assert ("orders", "k5") not in idempotency._local_locks
+
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""Migration discovery and statement splitting"""
+import pytest
+import migrate
+from migrate import split_statements
+
+
+def test_splits_on_top_level_semicolons():
+    assert split_statements("SELECT 1; SELECT 2;\n") == ["SELECT 1", "SELECT 2"]
+
+
+def test_last_statement_without_semicolon_is_kept():
+    assert split_statements("SELECT 1;\nSELECT 2") == ["SELECT 1", "SELECT 2"]
+
+
+def test_semicolons_in_quotes_do_not_split():
+    sql = """INSERT INTO t VALUES ('a;b'); CREATE INDEX "odd;name" ON t(x);"""
+    assert split_statements(sql) == ["INSERT INTO t VALUES ('a;b')", 'CREATE INDEX "odd;name" ON t(x)']
+
+
+def test_escaped_quotes_stay_inside_the_literal():
+    assert split_statements("SELECT 'it''s; fine'; SELECT 2") == ["SELECT 'it''s; fine'", "SELECT 2"]
+
+
+def test_comments_are_dropped_including_semicolons_in_them():
+    sql = "-- build it; concurrently\nCREATE INDEX a ON t(x); -- trailing;\n-- only a comment"
+    assert split_statements(sql) == ["CREATE INDEX a ON t(x)"]
+
+
+def test_double_dash_inside_a_literal_is_not_a_comment():
+    assert split_statements("SELECT '--not a comment;'; SELECT 2") == ["SELECT '--not a comment;'", "SELECT 2"]
+
+
+@pytest.mark.parametrize("sql", ["", "   \n", ";;;", "-- nothing\n;"])
+def test_empty_input_gives_no_statements(sql):
+    assert split_statements(sql) == []
+
+
+def test_concurrent_migrations_are_detected_and_split():
+    migrations = {m.filename: m for m in migrate.load_migrations()}
+    assert "02_insert_dummy_data.sql" not in migrations
+    assert [m.version for m in migrations.values()] == sorted(m.version for m in migrations.values())
+
+    concurrent = [m for m in migrations.values() if not m.transactional]
+    assert concurrent
+    for migration in concurrent:
+        for statement in split_statements(migration.sql):
+            assert statement.upper().startswith(("CREATE", "DROP")), (migration.filename, statement)
+
+
+def test_concurrently_regex():
+    assert migrate.CONCURRENTLY.search("create unique index concurrently if not exists x on t(a)")
+    assert migrate.CONCURRENTLY.search("DROP INDEX\n  CONCURRENTLY x")
+    assert not migrate.CONCURRENTLY.search("CREATE INDEX x ON t(a); -- not concurrent")
@@ -0,0 +1,85 @@
+"""Signed tokens and password hashing"""
+import time
+import hashlib
+import pytest
+import auth
+from signing import sign, unsign
+
+SECRET = b"test secret"
+
+
+def test_round_trip_keeps_payload_and_adds_type_and_expiry():
+    token, expires_at = sign(SECRET, {"sub": 1}, 60, "access")
+    claims = unsign(SECRET, token, "access")
+    assert claims == {"sub": 1, "typ": "access", "exp": expires_at}
+
+
+def test_tampered_payload_or_signature_is_rejected():
+    token, _ = sign(SECRET, {"sub": 1, "role": "customer"}, 60, "access")
+    other, _ = sign(SECRET, {"sub": 1, "role": "admin"}, 60, "access")
+    body, signature = token.split(".")
+    assert unsign(SECRET, other.split(".")[0] + "." + signature, "access") is None
+    assert unsign(SECRET, body + "." + signature[:-1] + ("A" if signature[-1] != "A" else "B"), "access") is None
+    assert unsign(b"other secret", token, "access") is None
+
+
+def test_token_of_another_type_is_rejected():
+    quote, _ = sign(SECRET, {"sub": 1}, 60, "quote")
+    assert unsign(SECRET, quote, "access") is None
+    assert unsign(SECRET, quote, "quote") is not None
+
+
+def test_expired_token_is_rejected():
+    token, _ = sign(SECRET, {"sub": 1}, -1, "access")
+    assert unsign(SECRET, token, "access") is None
+
+
+@pytest.mark.parametrize("token", [
+    "", "no-dot", "abc.é", "é.é", "é", "..", "abc.def.ghi", "%%%.%%%",
+])
+def test_malformed_tokens_are_rejected_without_errors(token):
+    assert unsign(SECRET, token, "access") is None
+
+
+def test_signed_non_object_payload_is_rejected():
+    from signing import _b64encode, _signature
+    body = _b64encode(b"[1, 2, 3]")
+    assert unsign(SECRET, f"{body}.{_signature(SECRET, body)}", "access") is None
+
+
+def test_scrypt_hash_verifies_and_is_current(monkeypatch):
+    # Smaller cost keeps the test fast; the format is the same
+    monkeypatch.setattr(auth, "SCRYPT_N", 2 ** 10)
+    stored = auth.hash_password_sync("correct horse")
+    assert stored.startswith("scrypt$1024$")
+    assert auth.verify_password_sync("correct horse", stored)
+    assert not auth.verify_password_sync("wrong horse", stored)
+    assert not auth.needs_rehash(stored)
+    assert auth.hash_password_sync("correct horse") != stored
+
+
+def test_legacy_and_weaker_hashes_need_rehash(monkeypatch):
+    legacy = hashlib.sha256(b"old password").hexdigest()
+    assert auth.verify_password_sync("old password", legacy)
+    assert not auth.verify_password_sync("other", legacy)
+    assert auth.needs_rehash(legacy)
+
+    monkeypatch.setattr(auth, "SCRYPT_N", 2 ** 10)
+    weaker = auth.hash_password_sync("pw")
+    monkeypatch.undo()
+    assert auth.verify_password_sync("pw", weaker)
+    assert auth.needs_rehash(weaker)
+
+
+def test_access_tokens_are_revoked_by_tokens_valid_after(monkeypatch):
+    monkeypatch.setattr(auth, "_secret", lambda: SECRET)
+    monkeypatch.setattr(auth, "_revoked_after", {})
+    token, _ = auth.issue_token({"userid": 5, "role": "customer"})
+    assert auth.verify_token(token)["sub"] == 5
+
+    time.sleep(0.01)  # iat has millisecond precision
+    auth.forget_tokens(5)
+    assert auth.verify_token(token) is None
+    time.sleep(0.01)
+    fresh, _ = auth.issue_token({"userid": 5, "role": "customer"})
+    assert auth.verify_token(fresh)["sub"] == 5
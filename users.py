@@ -0,0 +1,162 @@
+"""
+User Writes
+Maps unique-constraint violations on "User" to the offending field (by
+constraint name, not by parsing the message) and bulk-imports users from CSV:
+COPY into a staging table, then one INSERT ... ON CONFLICT merge.
+
+    python users.py partner_customers.csv
+"""
+import sys
+import time
+import psycopg2
+from database import get_db_connection
+
+# Unique constraints on "User" -> (API field, message)
+UNIQUE_CONSTRAINTS = {
+    "User_email_key": ("email", "This email address is already registered"),
+    "unique_phone_number": ("phone_number", "This phone number is already registered"),
+}
+
+IMPORT_COLUMNS = ("full_name", "email", "phone_number", "password_hash")
+
+# Stored for imported users without a hash; matches no password
+NO_PASSWORD = "!"
+
+# Rejected rows listed in the import response (all are counted)
+MAX_REPORTED_REJECTS = 100
+
+
+def duplicate_field(e: psycopg2.errors.UniqueViolation) -> tuple:
+    """(API field, message) for a unique violation on the "User" table"""
+    return UNIQUE_CONSTRAINTS.get(e.diag.constraint_name, (None, "Duplicate value"))
+
+
+def _read_header(stream) -> list:
+    header = stream.readline()
+    if isinstance(header, bytes):
+        header = header.decode("utf-8-sig")
+    columns = [c.strip().lower() for c in header.strip().split(",")]
+    unknown = set(columns) - set(IMPORT_COLUMNS)
+    if unknown or not {"full_name", "email"} <= set(columns):
+        raise ValueError(f"CSV header must use {', '.join(IMPORT_COLUMNS)} "
+                         f"(full_name and email required), got: {header.strip()}")
+    return columns
+
+
+def import_users(stream) -> dict:
+    """Create or update customers from a CSV file object (header row first).
+
+    Rows are matched on email: new emails are inserted as customers, existing
+    active users get their name/phone updated. Rows with a missing or too long
+    value, or a phone number that belongs to another user, are rejected; the
+    rest are merged in one transaction.
+    """
+    columns = _read_header(stream)
+    staging_columns = {
+        "full_name": "fullname", "email": "email",
+        "phone_number": "phonenumber", "password_hash": "passwordhash",
+    }
+    started = time.perf_counter()
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE user_import (
+                line BIGSERIAL,
+                fullname TEXT,
+                email TEXT,
+                phonenumber TEXT,
+                passwordhash TEXT
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            f"COPY user_import ({', '.join(staging_columns[c] for c in columns)}) FROM STDIN WITH (FORMAT csv)",
+            stream
+        )
+        cur.execute("""
+            UPDATE user_import
+            SET fullname = NULLIF(btrim(fullname), ''),
+                email = NULLIF(btrim(email), ''),
+                phonenumber = NULLIF(btrim(phonenumber), ''),
+                passwordhash = COALESCE(NULLIF(passwordhash, ''), %s)
+        """, (NO_PASSWORD,))
+        loaded = cur.rowcount
+        cur.execute("CREATE INDEX ON user_import (email)")
+        cur.execute("CREATE INDEX ON user_import (phonenumber)")
+        cur.execute("ANALYZE user_import")
+
+        cur.execute("""
+            CREATE TEMP TABLE user_import_rejected ON COMMIT DROP AS
+            SELECT line, email, 'missing or too long value' AS reason
+            FROM user_import
+            WHERE fullname IS NULL OR email IS NULL
+               OR length(fullname) > 100 OR length(email) > 100
+               OR length(phonenumber) > 20 OR length(passwordhash) > 255
+        """)
+        cur.execute("DELETE FROM user_import s USING user_import_rejected r WHERE s.line = r.line")
+        # Later rows for the same email win
+        cur.execute("""
+            DELETE FROM user_import s
+            USING user_import later
+            WHERE later.email = s.email AND later.line > s.line
+        """)
+        cur.execute("""
+            WITH taken AS (
+                DELETE FROM user_import s
+                WHERE s.phonenumber IS NOT NULL AND (
+                    EXISTS (SELECT 1 FROM "User" u
+                            WHERE u.phonenumber = s.phonenumber AND u.email <> s.email)
+                    OR EXISTS (SELECT 1 FROM user_import o
+                               WHERE o.phonenumber = s.phonenumber AND o.line < s.line)
+                )
+                RETURNING s.line, s.email
+            )
+            INSERT INTO user_import_rejected
+            SELECT line, email, 'phone number belongs to another user' FROM taken
+        """)
+
+        cur.execute("""
+            INSERT INTO "User" (fullname, email, passwordhash, role, phonenumber)
+            SELECT fullname, email, passwordhash, 'customer', phonenumber
+            FROM user_import
+            ON CONFLICT (email) DO UPDATE
+            SET fullname = EXCLUDED.fullname,
+                phonenumber = COALESCE(EXCLUDED.phonenumber, "User".phonenumber)
+            WHERE "User".deletedat IS NULL
+            RETURNING (xmax = 0) AS inserted
+        """)
+        merged = cur.fetchall()
+        inserted = sum(1 for row in merged if row["inserted"])
+
+        cur.execute("SELECT COUNT(*) AS count FROM user_import_rejected")
+        rejected_count = cur.fetchone()["count"]
+        # Line numbers count the header, as in a spreadsheet
+        cur.execute("SELECT line + 1 AS line, email, reason FROM user_import_rejected ORDER BY line LIMIT %s",
+                    (MAX_REPORTED_REJECTS,))
+        rejected = cur.fetchall()
+        conn.commit()
+
+    return {
+        "rows": loaded,
+        "inserted": inserted,
+        "updated": len(merged) - inserted,
+        # Archived users and duplicate emails within the file
+        "skipped": loaded - rejected_count - len(merged),
+        "rejected_count": rejected_count,
+        "rejected": rejected,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python users.py <users.csv>")
+        sys.exit(1)
+    try:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            result = import_users(f)
+        print(f"[SUCCESS] {result['rows']} rows in {result['seconds']}s: {result['inserted']} inserted, "
+              f"{result['updated']} updated, {result['skipped']} skipped, {result['rejected_count']} rejected")
+        for row in result["rejected"]:
+            print(f"   line {row['line']}: {row['email']} ({row['reason']})")
+    except Exception as e:
+        print(f"[ERROR] Import failed: {e}")
+        sys.exit(1)
@@ -1,6 +1,12 @@
 from database import execute_query
-from main import app
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from auth import issue_token
+from routers import orders
+
+# Only the orders routes: no static assets, pools or other routers to load
+app = FastAPI()
+app.include_router(orders.router)
 import json
 
 # 1. Check Order Count
@@ -9,7 +15,8 @@ print(f"Total Orders in DB: {count}")
 
 # 2. Test Pagination API
 client = TestClient(app)
-response = client.get("/api/orders?page=1&limit=5")
+token, _ = issue_token({"userid": 0, "role": "admin"})
+response = client.get("/api/orders?page=1&limit=5", headers={"Authorization": f"Bearer {token}"})
 data = response.json()
 
 print(f"API Response Status: {response.status_code}")